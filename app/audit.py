@@ -0,0 +1,136 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+
+from db import engine
+from models import AuditLog
+
+AUDIT_QUEUE_SIZE = int(os.environ.get("DATA_GUI_AUDIT_QUEUE_SIZE", 10_000))
+AUDIT_BATCH_SIZE = int(os.environ.get("DATA_GUI_AUDIT_BATCH_SIZE", 200))
+AUDIT_FLUSH_SECONDS = float(os.environ.get("DATA_GUI_AUDIT_FLUSH_SECONDS", 1.0))
+AUDIT_FALLBACK_PATH = os.environ.get("DATA_GUI_AUDIT_FALLBACK", "audit_fallback.jsonl")
+
+logger = logging.getLogger(__name__)
+
+_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+_stop = threading.Event()
+_start_lock = threading.Lock()
+_file_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+def make_entry(user, action: str, entity: Optional[str] = None, entity_id: Optional[int] = None,
+               before: Optional[Dict[str, Any]] = None, after: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"at": datetime.utcnow(), "user_id": user.id if user else None, "user_name": user.name if user else None,
+            "action": action, "entity": entity, "entity_id": entity_id, "before": before, "after": after}
+
+def to_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    # Snapshot serialization happens here, off the request path when called from the writer
+    row = dict(entry)
+    for key in ("before", "after"):
+        if row[key] is not None and not isinstance(row[key], str):
+            row[key] = json.dumps(row[key], default=str)
+    return row
+
+# --- Durable fallback (append-only JSON lines) ---
+def _append_fallback(entries: List[Dict[str, Any]]):
+    with _file_lock, open(AUDIT_FALLBACK_PATH, "a", encoding="utf-8") as f:
+        for e in entries:
+            f.write(json.dumps(to_row(e), default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def replay_fallback(bind=None) -> int:
+    # Re-insert entries parked while the database was unavailable
+    with _file_lock:
+        if not os.path.exists(AUDIT_FALLBACK_PATH):
+            return 0
+        with open(AUDIT_FALLBACK_PATH, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            row["at"] = datetime.fromisoformat(row["at"])
+        for i in range(0, len(rows), AUDIT_BATCH_SIZE):
+            with (bind or engine).begin() as conn:
+                conn.execute(insert(AuditLog.__table__).values(rows[i:i + AUDIT_BATCH_SIZE]))
+        os.unlink(AUDIT_FALLBACK_PATH)
+    return len(rows)
+
+# --- Background writer ---
+def write_batch(entries: List[Dict[str, Any]], bind=None):
+    try:
+        with (bind or engine).begin() as conn:
+            conn.execute(insert(AuditLog.__table__).values([to_row(e) for e in entries]))
+    except Exception:
+        logger.exception("Audit batch of %d entries failed; appending to %s", len(entries), AUDIT_FALLBACK_PATH)
+        _append_fallback(entries)
+
+def _drain() -> List[Dict[str, Any]]:
+    # Flush when the batch is full or AUDIT_FLUSH_SECONDS have passed, whichever comes first
+    batch = []
+    deadline = time.monotonic() + AUDIT_FLUSH_SECONDS
+    while len(batch) < AUDIT_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _run():
+    try:
+        replay_fallback()
+    except Exception:
+        logger.exception("Replaying %s failed; will retry on next start", AUDIT_FALLBACK_PATH)
+    while not (_stop.is_set() and _queue.empty()):
+        batch = _drain()
+        if batch:
+            write_batch(batch)
+            for _ in batch:
+                _queue.task_done()
+
+def start():
+    global _thread
+    with _start_lock:
+        if _thread is None or not _thread.is_alive():
+            _stop.clear()
+            _thread = threading.Thread(target=_run, name="audit-writer", daemon=True)
+            _thread.start()
+
+def enqueue(entry: Dict[str, Any]):
+    start()
+    try:
+        _queue.put(entry, timeout=AUDIT_FLUSH_SECONDS)
+    except queue.Full:
+        # Never drop an audit record: park it on disk for the next replay
+        _append_fallback([entry])
+
+def flush(timeout: Optional[float] = None):
+    if _thread is not None and _thread.is_alive():
+        if timeout is None:
+            _queue.join()
+            return
+        end = time.monotonic() + timeout
+        while _queue.unfinished_tasks and time.monotonic() < end:
+            time.sleep(0.01)
+
+@atexit.register
+def shutdown(timeout: float = 10.0):
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
+    leftover = []
+    while True:
+        try:
+            leftover.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if leftover:
+        write_batch(leftover)
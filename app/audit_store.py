@@ -0,0 +1,198 @@
+import argparse
+import os
+import re
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+from sqlalchemy import Column, Index, MetaData, Table, func, inspect, select, text, union_all, and_, or_
+
+from db import engine
+from models import AuditLog
+
+AUDIT_RETENTION_MONTHS = int(os.environ.get("DATA_GUI_AUDIT_RETENTION_MONTHS", 12))
+AUDIT_ARCHIVE_DIR = os.environ.get("DATA_GUI_AUDIT_ARCHIVE_DIR", "audit_archive")
+MONTH_TABLE = re.compile(r"^auditlog_(\d{4})(\d{2})$")
+
+Cursor = Tuple[datetime, int]
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.year * 12 + d.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+def _overlaps(month: date, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    lo, hi = datetime.combine(month, time()), datetime.combine(add_months(month, 1), time())
+    return (start is None or hi > start) and (end is None or lo < end)
+
+def month_table(month: date) -> Table:
+    # Same columns as AuditLog; index names must be unique per database on SQLite
+    name = f"auditlog_{month:%Y%m}"
+    cols = [Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in AuditLog.__table__.columns]
+    return Table(name, MetaData(), *cols, Index(f"ix_{name}_at", "at"),
+                 Index(f"ix_{name}_user_at", "user_id", "at"), Index(f"ix_{name}_entity", "entity", "entity_id"))
+
+def list_month_tables(conn) -> List[date]:
+    months = []
+    for name in inspect(conn).get_table_names():
+        m = MONTH_TABLE.match(name)
+        if m:
+            months.append(date(int(m[1]), int(m[2]), 1))
+    return sorted(months)
+
+# --- Postgres: native range partitioning on AuditLog.at ---
+def _is_partitioned(conn) -> bool:
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE relname = 'auditlog' AND relkind IN ('r', 'p')")).scalar() == "p"
+
+def _create_partition(conn, month: date):
+    name = f"auditlog_{month:%Y%m}"
+    bounds = f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    window = f"at >= '{month}' AND at < '{add_months(month, 1)}'"
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return
+    if conn.execute(text(f"SELECT 1 FROM auditlog_default WHERE {window} LIMIT 1")).first() is None:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF auditlog {bounds}"))
+        return
+    # Entries written while no partition covered this month are in auditlog_default, and Postgres won't create a
+    # partition over rows the default still holds: move them into a plain table (same transaction), then attach it
+    conn.execute(text(f"CREATE TABLE {name} (LIKE auditlog INCLUDING DEFAULTS)"))
+    conn.execute(text(f"WITH moved AS (DELETE FROM auditlog_default WHERE {window} RETURNING *) "
+                      f"INSERT INTO {name} SELECT * FROM moved"))
+    conn.execute(text(f"ALTER TABLE auditlog ATTACH PARTITION {name} {bounds}"))
+
+def _create_partitions(conn, start: date, end: date):
+    month = month_start(start)
+    while month <= month_start(end):
+        _create_partition(conn, month)
+        month = add_months(month, 1)
+
+def _partition_postgres(conn):
+    # Convert the plain table create_all() made into a partitioned one, keeping existing rows
+    table = AuditLog.__table__
+    conn.execute(text("ALTER TABLE auditlog RENAME TO auditlog_legacy"))
+    for index in table.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    conn.execute(text("ALTER TABLE auditlog_legacy DROP CONSTRAINT IF EXISTS auditlog_pkey"))
+    conn.execute(text(
+        "CREATE TABLE auditlog (id BIGSERIAL, at TIMESTAMP NOT NULL, user_id INTEGER REFERENCES \"user\"(id), "
+        "user_name VARCHAR, action VARCHAR NOT NULL, entity VARCHAR, entity_id INTEGER, before VARCHAR, after VARCHAR, "
+        "PRIMARY KEY (id, at)) PARTITION BY RANGE (at)"))
+    conn.execute(text("CREATE TABLE IF NOT EXISTS auditlog_default PARTITION OF auditlog DEFAULT"))
+    for index in table.indexes:
+        index.create(conn)
+    oldest = conn.execute(text("SELECT min(at) FROM auditlog_legacy")).scalar()
+    _create_partitions(conn, oldest or date.today(), date.today())
+    cols = ", ".join(c.name for c in table.columns)
+    conn.execute(text(f"INSERT INTO auditlog ({cols}) SELECT {cols} FROM auditlog_legacy"))
+    conn.execute(text("SELECT setval(pg_get_serial_sequence('auditlog', 'id'), coalesce(max(id), 0) + 1, false) FROM auditlog"))
+    conn.execute(text("DROP TABLE auditlog_legacy"))
+
+def setup(bind=None, months_ahead: int = 2, since: Optional[date] = None):
+    # `since` pre-creates older months too, for backfills
+    with (bind or engine).begin() as conn:
+        if conn.dialect.name != "postgresql":
+            return
+        if not _is_partitioned(conn):
+            _partition_postgres(conn)
+        _create_partitions(conn, since or date.today(), add_months(month_start(date.today()), months_ahead))
+
+# --- SQLite: roll closed months out of the hot table into auditlog_YYYYMM ---
+def roll(bind=None, today: Optional[date] = None) -> List[date]:
+    current = month_start(today or date.today())
+    table = AuditLog.__table__
+    rolled = []
+    with (bind or engine).begin() as conn:
+        if conn.dialect.name == "postgresql":
+            return rolled
+        oldest = conn.execute(select(table.c.at).where(table.c.at < current).order_by(table.c.at).limit(1)).scalar()
+        # The newest row stays behind: SQLite numbers new rows max(id) + 1, so emptying the hot table would hand
+        # out ids the month tables already hold. It moves on the next roll, once there is a newer one.
+        newest = conn.execute(select(func.max(table.c.id))).scalar()
+        month = month_start(oldest) if oldest else current
+        while month < current:
+            target = month_table(month)
+            target.create(conn, checkfirst=True)
+            window = and_(table.c.at >= month, table.c.at < add_months(month, 1), table.c.id != newest)
+            conn.execute(target.insert().from_select([c.name for c in table.columns], select(*table.columns).where(window)))
+            conn.execute(table.delete().where(window))
+            rolled.append(month)
+            month = add_months(month, 1)
+    return rolled
+
+# --- Retention: compress old months to Parquet and drop them ---
+def archive(bind=None, retention_months: int = AUDIT_RETENTION_MONTHS, dest: str = AUDIT_ARCHIVE_DIR,
+            today: Optional[date] = None) -> List[str]:
+    from export import write_parquet
+    bind = bind or engine
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    os.makedirs(dest, exist_ok=True)
+    written = []
+    with bind.connect() as conn:
+        months = [m for m in list_month_tables(conn) if m < cutoff]
+    for month in months:
+        table = month_table(month)
+        path = os.path.join(dest, f"{table.name}.parquet")
+        write_parquet(select(*table.columns).order_by(table.c.at), path, bind=bind)
+        with bind.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f"ALTER TABLE auditlog DETACH PARTITION {table.name}"))
+            conn.execute(text(f"DROP TABLE {table.name}"))
+        written.append(path)
+    return written
+
+def maintain(bind=None) -> dict:
+    setup(bind)
+    return {"rolled": [str(m) for m in roll(bind)], "archived": archive(bind)}
+
+# --- Paged query API: newest first, keyset on (at, id) ---
+def _filtered(table, start, end, user_id, entity, action, after: Optional[Cursor]):
+    q = select(*table.columns)
+    if start:
+        q = q.where(table.c.at >= start)
+    if end:
+        q = q.where(table.c.at < end)
+    if user_id is not None:
+        q = q.where(table.c.user_id == user_id)
+    if entity:
+        q = q.where(table.c.entity == entity)
+    if action:
+        q = q.where(table.c.action == action)
+    if after is not None:
+        at, last_id = after
+        q = q.where(or_(table.c.at < at, and_(table.c.at == at, table.c.id < last_id)))
+    return q
+
+def query(conn, start: Optional[datetime] = None, end: Optional[datetime] = None, user_id: Optional[int] = None,
+          entity: Optional[str] = None, action: Optional[str] = None, after: Optional[Cursor] = None, limit: int = 100):
+    args = (start, end, user_id, entity, action, after)
+    hot = AuditLog.__table__
+    if conn.dialect.name == "postgresql":
+        # The range predicate on `at` lets the planner prune to the partitions it covers
+        q = _filtered(hot, *args).order_by(hot.c.at.desc(), hot.c.id.desc()).limit(limit + 1)
+    else:
+        # Only the hot table plus the closed months the range overlaps are read
+        tables = [hot] + [month_table(m) for m in reversed(list_month_tables(conn)) if _overlaps(m, start, end)]
+        parts = [_filtered(t, *args) for t in tables]
+        u = (parts[0] if len(parts) == 1 else union_all(*parts)).subquery()
+        q = select(u).order_by(u.c.at.desc(), u.c.id.desc()).limit(limit + 1)
+    rows = conn.execute(q).all()
+    next_cursor = (rows[limit - 1].at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit log partition maintenance.")
+    parser.add_argument("command", choices=["setup", "roll", "archive", "maintain"])
+    parser.add_argument("--retention-months", type=int, default=AUDIT_RETENTION_MONTHS)
+    parser.add_argument("--dest", default=AUDIT_ARCHIVE_DIR)
+    args = parser.parse_args()
+    if args.command == "setup":
+        setup()
+    elif args.command == "roll":
+        print("Rolled:", [str(m) for m in roll()])
+    elif args.command == "archive":
+        print("Archived:", archive(retention_months=args.retention_months, dest=args.dest))
+    else:
+        print(maintain())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import streamlit as st
+from sqlmodel import select
+
+import refdata
+from db import get_session
+from models import User
+from utils import find_user_by_email
+
+_current_user: ContextVar[Optional[User]] = ContextVar("current_user", default=None)
+
+def current_user() -> Optional[User]:
+    # The signed-in user of this rerun, for the page scripts under views/
+    return _current_user.get()
+
+@contextmanager
+def user_scope(user: User):
+    token = _current_user.set(user)
+    try:
+        yield user
+    finally:
+        _current_user.reset(token)
+
+def get_auth_user():
+    # If Streamlit Authenticator is configured in secrets, use it.
+    if "credentials" in st.secrets:
+        import streamlit_authenticator as stauth  # ~0.4s of imports; the demo login never needs it
+        creds = st.secrets["credentials"]
+        cookie = st.secrets.get("cookie", {})
+        authenticator = stauth.Authenticate(
+            credentials=creds,
+            cookie_name=cookie.get("name", "contract_workflow_auth"),
+            key=cookie.get("key", "CHANGEME"),
+            cookie_expiry_days=int(cookie.get("expiry_days", 14)),
+        )
+        name, auth_status, username = authenticator.login("Login", "main")
+        if auth_status:
+            st.session_state["authenticator"] = authenticator
+            with get_session() as s:
+                # Pull email from creds; keys differ by username
+                u_meta = creds["usernames"][username]
+                email = u_meta.get("email")
+                user = find_user_by_email(s, email) if email else None
+                if not user and email:
+                    # auto-provision user if not present
+                    role = "officer"
+                    user = User(name=u_meta.get("name", username), email=email, role=role, active=True)
+                    s.add(user); s.commit(); s.refresh(user)
+                    refdata.invalidate()
+            return user
+        elif auth_status is False:
+            st.error("Invalid credentials")
+            return None
+        else:
+            st.info("Please log in")
+            return None
+    else:
+        # Demo login fallback
+        st.sidebar.info("Demo Login (secrets not configured)")
+        with get_session() as s:
+            users = s.exec(select(User).where(User.active==True).order_by(User.role, User.name)).all()
+        choice = st.sidebar.selectbox("Select user", users, format_func=lambda u: f"{u.name} ({u.role})")
+        return choice
@@ -0,0 +1,578 @@
+import argparse
+import gc
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, date
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import create_engine, insert, func, select as sa_select, text
+from sqlmodel import SQLModel, Session, select
+
+from models import User, Contract, Task
+from utils import as_dict
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def seed_tasks(bind, n: int, batch: int = 50_000):
+    from migrate import ensure_columns
+    SQLModel.metadata.create_all(bind)
+    ensure_columns(bind)
+    with bind.begin() as conn:
+        have = conn.execute(sa_select(func.count()).select_from(Task.__table__)).scalar_one()
+        if have >= n:
+            return
+        if not conn.execute(sa_select(Contract.__table__.c.id).limit(1)).first():
+            conn.execute(insert(User.__table__), [{"name": "Bench Officer", "email": "bench@example.com", "role": "officer",
+                                                   "active": True, "created_at": datetime.utcnow()}])
+            conn.execute(insert(Contract.__table__), [{"number": "BENCH-0001", "title": "Benchmark", "status": "Assigned",
+                                                       "officer_id": 1, "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}])
+        now, today = datetime.utcnow(), date.today()
+        for start in range(have, n, batch):
+            conn.execute(insert(Task.__table__), [
+                {"contract_id": 1, "description": f"Benchmark task {i} " + "x" * 40, "status": "Done", "assigned_to": 1,
+                 "due_date": today - timedelta(days=i % 365), "created_at": now, "updated_at": now,
+                 "completed_at": now - timedelta(minutes=i)}
+                for i in range(start, min(start + batch, n))])
+
+# --- Export: legacy (ORM + as_dict + DataFrame) vs streaming, each in a fresh process ---
+def export_worker(url: str, mode: str, fmt: str) -> dict:
+    bind = create_engine(url)
+    out = os.path.join(tempfile.gettempdir(), f"bench_export.{fmt.lower()}")
+    t0 = time.perf_counter()
+    if mode == "legacy":
+        import pandas as pd
+        with Session(bind) as s:
+            rows = s.exec(select(Task).where(Task.status == "Done").order_by(Task.completed_at.desc())).all()
+        data = pd.DataFrame([as_dict(t) for t in rows]).to_csv(index=False).encode("utf-8")
+        with open(out, "wb") as f:
+            f.write(data)
+    else:
+        from export import export_query, write_csv, write_parquet
+        stmt = export_query(Task, clauses=[Task.status == "Done"], order_by=[Task.completed_at.desc()])
+        (write_parquet if fmt == "Parquet" else write_csv)(stmt, out, bind=bind)
+    result = {"mode": mode, "format": fmt, "seconds": round(time.perf_counter() - t0, 3),
+              "peak_rss_mb": round(peak_rss_mb(), 1), "file_mb": round(os.path.getsize(out) / 2**20, 1)}
+    os.unlink(out)
+    return result
+
+def bench_export(url: str, rows: int):
+    seed_tasks(create_engine(url), rows)
+    results = []
+    for mode, fmt in [("legacy", "CSV"), ("stream", "CSV"), ("stream", "Parquet")]:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "export-worker", "--url", url,
+                               "--mode", mode, "--format", fmt], capture_output=True, text=True, check=True)
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        print(f"{mode:>7} {fmt:<8} {results[-1]['seconds']:>8.2f}s  peak RSS {results[-1]['peak_rss_mb']:>8.1f} MiB"
+              f"  file {results[-1]['file_mb']:.1f} MiB")
+    return results
+
+# --- Import: batched upserts vs one add/commit/refresh + audit per contract (the add_contract form) ---
+def write_contracts_csv(path: str, rows: int, prefix: str = "IMP"):
+    import csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["number", "title", "agency", "naics", "set_aside", "status", "due_date"])
+        for i in range(rows):
+            w.writerow([f"{prefix}-{i:07d}", f"Solicitation {i}", ["Army", "Navy", "GSA", "VA"][i % 4],
+                        "541511", "SDVOSB", "Draft", (date.today() + timedelta(days=i % 90)).isoformat()])
+
+def bench_import(url: str, rows: int, legacy_rows: int):
+    from import_data import import_file
+    from migrate import migrate
+    from utils import log
+    bind = create_engine(url)
+    migrate(bind)
+    path = os.path.join(tempfile.gettempdir(), "bench_import.csv")
+    write_contracts_csv(path, rows)
+    for label in ("insert", "upsert"):  # second pass hits ON CONFLICT for every row
+        r = import_file(path, "Contract", bind=bind)
+        print(f"{label:>7}  {r['written']:>9} rows {r['seconds']:>8.2f}s  {r['written'] / r['seconds']:>10,.0f} rows/s")
+    os.unlink(path)
+    t0 = time.perf_counter()
+    with Session(bind) as s:
+        for i in range(legacy_rows):
+            c = Contract(number=f"LEG-{i:07d}", title=f"Solicitation {i}", agency="Army", status="Draft")
+            s.add(c); s.commit(); s.refresh(c)
+            log(s, None, "create", "Contract", c.id, after=as_dict(c), atomic=True)
+            s.commit()
+    seconds = time.perf_counter() - t0
+    print(f"{'per-row':>7}  {legacy_rows:>9} rows {seconds:>8.2f}s  {legacy_rows / seconds:>10,.0f} rows/s")
+
+# --- Query suite: the queries app.py issues, against a database filled by seed.py ---
+def app_queries(s) -> Dict[str, Callable[[], Any]]:
+    from queries import contract_filters, task_filters, count_rows, seek_page, lookup_contracts, lookup_tasks
+    from reports import (ACTIVE_CONTRACT_STATUSES, summary_counts, overdue_counts, officer_workload,
+                         my_workload, completion_throughput)
+    import audit_store
+    import search
+    c, t = Contract, Task
+    # The busiest officer is the worst case for the dashboard and per-officer filters
+    officer = s.exec(select(c.officer_id).where(c.officer_id.is_not(None)).group_by(c.officer_id)
+                     .order_by(func.count().desc()).limit(1)).first()
+    _, cursor = seek_page(s, c, [], page_size=50)
+    since = datetime.utcnow() - timedelta(days=30)
+    page = lambda model, clauses, after=None: lambda: seek_page(s, model, clauses, after, page_size=50)
+    return {
+        "dashboard header": lambda: my_workload(s, officer),
+        "dashboard contracts": page(c, contract_filters(officer_id=officer)),
+        "dashboard tasks": page(t, task_filters(assigned_to=officer)),
+        "contracts page": page(c, []),
+        "contracts page 2": page(c, [], cursor),
+        "contracts count": lambda: count_rows(s, c, []),
+        "contracts by status": page(c, contract_filters(status="In Progress")),
+        "contracts by officer": page(c, contract_filters(officer_id=officer)),
+        "contracts agency contains": page(c, contract_filters(agency="Navy")),
+        "contracts by naics": page(c, contract_filters(naics="541330")),
+        "contract lookup": lambda: lookup_contracts(s, "Cloud"),
+        "contract search": lambda: search.search(s, c, "cloud migration"),
+        "contract search broad": lambda: search.search(s, c, "navy"),
+        "contract search count": lambda: search.count_matches(s, c, "navy"),
+        "tasks page": page(t, []),
+        "tasks count": lambda: count_rows(s, t, []),
+        "tasks by status": page(t, task_filters(status="Blocked")),
+        "tasks due before": page(t, task_filters(due_before=date.today())),
+        "tasks by assignee": page(t, task_filters(assigned_to=officer)),
+        "task lookup": lambda: lookup_tasks(s, "Cyber"),
+        "task search": lambda: search.search(s, t, "cyber", task_filters(status="Blocked")),
+        "report summary": lambda: summary_counts(s),
+        "report overdue": lambda: overdue_counts(s),
+        "report workload": lambda: officer_workload(s),
+        "report throughput": lambda: completion_throughput(s),
+        "report active preview": lambda: s.exec(select(c).where(c.status.in_(ACTIVE_CONTRACT_STATUSES))
+                                                .order_by(c.due_date).limit(200)).all(),
+        "report completed preview": lambda: s.exec(select(t).where(t.status == "Done")
+                                                   .order_by(t.completed_at.desc()).limit(200)).all(),
+        "audit recent": lambda: audit_store.query(s.connection(), start=since, limit=100),
+        "audit by user": lambda: audit_store.query(s.connection(), start=since, user_id=officer, limit=100),
+        "audit by entity": lambda: audit_store.query(s.connection(), start=since, entity="Contract", action="update", limit=100),
+    }
+
+def _result_rows(result) -> int:
+    if isinstance(result, tuple):  # (rows, next_cursor) from the pagers
+        result = result[0]
+    return 1 if isinstance(result, int) else len(result)
+
+def percentile(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, round(q * (len(xs) - 1)))]
+
+def _scanned(node) -> int:
+    # Rows each scan node read: what it returned plus what its filter threw away, over all loops
+    n = 0
+    if "Scan" in node["Node Type"] and node["Node Type"] != "Bitmap Index Scan":
+        n += (node["Actual Rows"] + node.get("Rows Removed by Filter", 0)) * node["Actual Loops"]
+    return n + sum(_scanned(child) for child in node.get("Plans", []))
+
+def explain_statements(bind, statements) -> dict:
+    # Postgres: EXPLAIN ANALYZE gives rows scanned; SQLite only exposes the plan shape
+    out = {"rows_scanned": None, "plan": []}
+    with bind.connect() as conn:
+        for sql, params in statements:
+            if conn.dialect.name == "postgresql":
+                plan = conn.exec_driver_sql("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params).scalar()[0]["Plan"]
+                out["rows_scanned"] = (out["rows_scanned"] or 0) + _scanned(plan)
+                out["plan"].append(plan["Node Type"])
+            else:
+                out["plan"] += [r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params)]
+            conn.rollback()
+    return out
+
+def bench_queries(url: str, repeat: int, only: Optional[str] = None) -> dict:
+    from sqlalchemy import event
+    from sqlalchemy.engine import make_url
+    bind = create_engine(url)
+    results = {}
+    with Session(bind) as s:
+        suite = app_queries(s)
+        s.rollback()
+        for name, fn in suite.items():
+            if only and only not in name:
+                continue
+            statements = []
+            capture = lambda conn, cur, sql, params, ctx, many: statements.append((sql, params))
+            event.listen(bind, "before_cursor_execute", capture)
+            try:
+                rows = _result_rows(fn())  # warm-up run; also records the SQL it issues
+            finally:
+                event.remove(bind, "before_cursor_execute", capture)
+            s.rollback()
+            times = []
+            for _ in range(repeat):
+                s.expunge_all()  # every run hydrates its ORM objects from scratch, as a fresh rerun would
+                gc.collect()
+                gc.disable()  # as timeit does: keep collector pauses out of the percentiles
+                try:
+                    t0 = time.perf_counter()
+                    fn()
+                    times.append((time.perf_counter() - t0) * 1000)
+                finally:
+                    gc.enable()
+                s.rollback()
+            selects = [(sql, p) for sql, p in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+            results[name] = {"p50_ms": round(percentile(times, 0.5), 3), "p95_ms": round(percentile(times, 0.95), 3),
+                             "rows": rows, "statements": len(statements), **explain_statements(bind, selects)}
+            r = results[name]
+            print(f"{name:<28} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  rows {rows:>7}"
+                  + (f"  scanned {r['rows_scanned']:>9}" if r["rows_scanned"] is not None else ""))
+    with bind.connect() as conn:
+        counts = {m.__tablename__: conn.execute(sa_select(func.count()).select_from(m.__table__)).scalar_one()
+                  for m in (User, Contract, Task)}
+    return {"meta": {"url": make_url(url).render_as_string(hide_password=True), "dialect": bind.dialect.name,
+                     "at": datetime.utcnow().isoformat(timespec="seconds"), "repeat": repeat, "counts": counts},
+            "queries": results}
+
+def compare_runs(old: dict, new: dict, threshold: float) -> List[str]:
+    # A query regresses when its p95 grows by more than `threshold` x and by at least a millisecond
+    regressions = []
+    for name, r in new["queries"].items():
+        before = old["queries"].get(name)
+        if not before:
+            continue
+        ratio = r["p95_ms"] / before["p95_ms"] if before["p95_ms"] else float("inf")
+        flag = ratio > threshold and r["p95_ms"] - before["p95_ms"] > 1
+        print(f"{name:<28} p95 {before['p95_ms']:>9.2f} -> {r['p95_ms']:>9.2f} ms  x{ratio:5.2f}"
+              + ("  REGRESSION" if flag else ""))
+        if flag:
+            regressions.append(name)
+    return regressions
+
+# --- Grid frames: ORM + as_dict vs column-wise from cursor tuples vs pandas read_sql (Arrow) ---
+def frame_builders():
+    import pandas as pd
+    import frames
+    cols = frames.columns(Task)
+    return {
+        "as_dict": lambda s, n: pd.DataFrame([as_dict(t) for t in s.exec(select(Task).order_by(Task.id).limit(n)).all()]),
+        "columnar": lambda s, n: frames.read_frame(s, sa_select(*cols).order_by(Task.id).limit(n)),
+        "read_sql arrow": lambda s, n: frames.read_frame_arrow(s, sa_select(*cols).order_by(Task.id).limit(n)),
+    }
+
+def bench_frames(url: str, sizes: List[int], repeat: int = 3):
+    import tracemalloc
+    bind = create_engine(url)
+    seed_tasks(bind, max(sizes))
+    results = []
+    for n in sizes:
+        for name, build in frame_builders().items():
+            times = []
+            for _ in range(repeat):
+                with Session(bind) as s:
+                    t0 = time.perf_counter()
+                    df = build(s, n)
+                    times.append(time.perf_counter() - t0)
+            with Session(bind) as s:  # separate run: tracemalloc slows allocation-heavy code
+                tracemalloc.start()
+                build(s, n)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            results.append({"rows": n, "builder": name, "seconds": round(min(times), 3),
+                            "peak_alloc_mb": round(peak / 2**20, 1), "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1)})
+            r = results[-1]
+            print(f"{n:>8} {name:<15} {r['seconds']:>7.3f}s  peak alloc {r['peak_alloc_mb']:>7.1f} MiB  frame {r['frame_mb']:>6.1f} MiB")
+    return results
+
+# --- Concurrent editors: blind overwrite (the old edit forms) vs version-checked saves ---
+def _edit_loop(bind, mode: str, ids: List[int], edits_each: int, think: float, seed: int, out: dict):
+    import random
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm.exc import StaleDataError
+    import edits
+    rng = random.Random(seed)
+    with Session(bind, expire_on_commit=False) as s:
+        for k in range(edits_each):
+            token, task_id = f"e{seed}.{k}", rng.choice(ids)
+            while True:
+                # Render the form, let the user type, then save what they typed
+                base = edits.snapshot(s.get(Task, task_id, populate_existing=True))
+                s.rollback()
+                time.sleep(think * rng.random())
+                values = {**base, "description": f"{base['description']} {token}"}
+                try:
+                    if mode == "overwrite":
+                        t = s.get(Task, task_id, populate_existing=True)
+                        t.description, t.updated_at = values["description"], datetime.utcnow()
+                        s.commit()
+                    else:
+                        edits.save(s, Task, base, values)
+                    out["saved"].append((task_id, token))
+                    break
+                except edits.EditConflict:
+                    out["conflicts"] += 1  # the user sees the diff, reloads and re-applies their edit
+                except (StaleDataError, OperationalError):
+                    s.rollback()
+                    out["retries"] += 1
+
+def bench_editors(url: str, editors: int, edits_each: int, rows: int, think: float):
+    import threading
+    bind = create_engine(url, pool_size=editors, max_overflow=0) if not url.startswith("sqlite") else \
+        create_engine(url, connect_args={"timeout": 30, "check_same_thread": False})
+    seed_tasks(bind, rows)
+    ids = list(range(1, rows + 1))
+    for mode in ("overwrite", "versioned"):
+        with bind.begin() as conn:
+            conn.execute(Task.__table__.update().where(Task.__table__.c.id.in_(ids)).values(description=""))
+        out = {"saved": [], "conflicts": 0, "retries": 0}
+        threads = [threading.Thread(target=_edit_loop, args=(bind, mode, ids, edits_each, think, i, out))
+                   for i in range(editors)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        seconds = time.perf_counter() - t0
+        with Session(bind) as s:
+            final = {t.id: set(t.description.split()) for t in s.exec(select(Task).where(Task.id.in_(ids))).all()}
+        lost = sum(1 for task_id, token in out["saved"] if token not in final[task_id])
+        print(f"{mode:>10}  {editors} editors x {edits_each} edits on {rows} rows  saved {len(out['saved']):>5}  "
+              f"lost {lost:>5}  conflicts {out['conflicts']:>5}  retries {out['retries']:>4}  "
+              f"{seconds:6.2f}s  {len(out['saved']) / seconds:8.1f} saves/s")
+
+# --- Live grids: every viewer re-reading its page on each refresh vs merging change-feed deltas ---
+def bench_changefeed(url: str, viewers: int, ticks: int, writes: int, write_every: int, rows: int, page_size: int = 50):
+    import random
+    from sqlalchemy import delete, event, update
+    import changefeed
+    import frames
+    from queries import count_rows, task_filters
+    from widgets import grid_page
+    bind = create_engine(url)
+    seed_tasks(bind, rows)
+    changefeed.setup(bind)
+    stats = {"queries": 0, "seconds": 0.0}
+    def before(conn, cur, sql, params, ctx, many):
+        conn.info["bench_t0"] = time.perf_counter()
+    def after(conn, cur, sql, params, ctx, many):
+        stats["queries"] += 1
+        stats["seconds"] += time.perf_counter() - conn.info.pop("bench_t0", time.perf_counter())
+    event.listen(bind, "before_cursor_execute", before)
+    event.listen(bind, "after_cursor_execute", after)
+    views = [[] if v % 2 == 0 else task_filters(assigned_to=1) for v in range(viewers)]  # the Tasks grid / "My Tasks"
+    with bind.connect() as conn:
+        ids = [r[0] for r in conn.execute(sa_select(Task.id).order_by(Task.id.desc()).limit(rows))]
+    for mode in ("requery", "feed"):
+        rng = random.Random(0)
+        if mode == "feed":
+            changefeed.start(bind)
+        caches = [{} for _ in range(viewers)]
+        stats.update(queries=0, seconds=0.0)
+        t0 = time.perf_counter()
+        for tick in range(ticks):
+            if tick % write_every == 0:
+                # Teammates' saves, made elsewhere: only the triggers (and NOTIFY) see them
+                with bind.begin() as conn:
+                    conn.execute(update(Task.__table__).where(Task.id.in_(rng.sample(ids, writes)))
+                                 .values(updated_at=datetime.utcnow(), version=Task.__table__.c.version + 1))
+                    if tick % (write_every * 4) == 0:
+                        conn.execute(delete(Task.__table__).where(Task.id == ids.pop(rng.randrange(len(ids)))))
+                if mode == "feed":
+                    changefeed.catch_up(bind)  # the listener gets there within a poll; here, before the refresh
+            for clauses, cache in zip(views, caches):
+                with Session(bind) as s:
+                    if mode == "requery":
+                        count_rows(s, Task, clauses)
+                        frames.seek_frame(s, Task, clauses, page_size=page_size)
+                    else:
+                        grid_page(s, cache, Task, clauses, tuple(map(str, clauses)), None, page_size)
+        seconds = time.perf_counter() - t0
+        if mode == "feed":
+            changefeed.stop()
+            with Session(bind) as s:
+                stale = sum(1 for clauses, cache in zip(views, caches)
+                            if list(cache["df"]["id"]) != list(frames.seek_frame(s, Task, clauses, page_size=page_size)[0]["id"]))
+        print(f"{mode:>8}  {viewers} viewers x {ticks} refreshes, writes every {write_every}  "
+              f"queries {stats['queries']:>6}  DB {stats['seconds']:>7.2f}s  wall {seconds:>7.2f}s"
+              + (f"  stale pages {stale}" if mode == "feed" else ""))
+
+# --- Deadlines: per-render due-date scans vs alerts precomputed by the scheduler ---
+def seed_open_tasks(bind, n: int, users: int, batch: int = 50_000):
+    # Like seed_tasks, but with a realistic status mix and due dates from a month ago to most of a year out
+    SQLModel.metadata.create_all(bind)
+    with bind.begin() as conn:
+        have = conn.execute(sa_select(func.count()).select_from(Task.__table__)).scalar_one()
+        if have >= n:
+            return
+        now, today = datetime.utcnow(), date.today()
+        if not conn.execute(sa_select(Contract.__table__.c.id).limit(1)).first():
+            conn.execute(insert(User.__table__), [{"name": f"Bench Officer {u}", "email": f"bench{u}@example.com", "role": "officer",
+                                                   "active": True, "created_at": now} for u in range(1, users + 1)])
+            conn.execute(insert(Contract.__table__), [{"number": f"BENCH-{c:04d}", "title": "Benchmark", "status": "Assigned",
+                                                       "officer_id": c % users + 1, "due_date": today + timedelta(days=c % 60 - 10),
+                                                       "created_at": now, "updated_at": now - timedelta(days=1)} for c in range(users * 20)])
+        statuses = ["To Do", "To Do", "In Progress", "Blocked", "Done", "Done", "Done", "Done"]
+        for start in range(have, n, batch):
+            conn.execute(insert(Task.__table__), [
+                {"contract_id": i % (users * 20) + 1, "description": f"Benchmark task {i}", "status": statuses[i % 8],
+                 "assigned_to": i % users + 1, "due_date": today + timedelta(days=i * 7 % 365 - 30),
+                 "created_at": now, "updated_at": now - timedelta(days=1)}
+                for i in range(start, min(start + batch, n))])
+        conn.execute(text("ANALYZE"))
+
+def bench_deadlines(url: str, rows: int, users: int, edits: int):
+    import random
+    from sqlalchemy import update
+    import deadlines
+    from reports import DUE_SOON_DAYS
+    bind = create_engine(url)
+    seed_open_tasks(bind, rows, users)
+    today = date.today()
+    soon = today + timedelta(days=DUE_SOON_DAYS)
+    def per_user(read):
+        times = []
+        with Session(bind) as s:
+            for uid in range(1, users + 1):
+                t0 = time.perf_counter()
+                n = read(s, uid)
+                times.append(time.perf_counter() - t0)
+        return n, times
+    def scan(s, uid):
+        # What a dashboard had to do without the scheduler: its own due-date scan per render
+        return sum(len(s.connection().execute(deadlines.window_query(model, model.__table__.c[owner] == uid,
+                                                                     model.__table__.c.due_date < soon)).all())
+                   for model, owner in ((Contract, "officer_id"), (Task, "assigned_to")))
+    def report(label, n, times):
+        print(f"{label:>22}  {users} users  p50 {percentile(times, 0.5) * 1000:7.2f}ms  "
+              f"p95 {percentile(times, 0.95) * 1000:7.2f}ms  total {sum(times):6.2f}s  (last user: {n} rows)")
+    report("per-render scan", *per_user(scan))
+    print(f"{'first run':>22}  {deadlines.rebuild(bind, today)}")
+    report("precomputed alerts", *per_user(lambda s, uid: deadlines.alerts(s, uid)[1]))
+    print(f"{'same day, no edits':>22}  {deadlines.run(bind, today)}")
+    with bind.begin() as conn:
+        ids = random.Random(0).sample(range(1, rows + 1), edits)
+        conn.execute(update(Task.__table__).where(Task.__table__.c.id.in_(ids))
+                     .values(due_date=today + timedelta(days=3), status="In Progress", updated_at=datetime.utcnow()))
+    print(f"{f'next day, {edits} edits':>22}  {deadlines.run(bind, today + timedelta(days=1))}")
+    print(f"{'a week later':>22}  {deadlines.run(bind, today + timedelta(days=8))}")
+
+# --- Startup: import cost and time to first render of app.py, each in a fresh process ---
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+HEAVY_MODULES = ("pandas", "pyarrow", "streamlit_authenticator", "openpyxl", "pydantic", "sqlmodel")
+IMPORTS_MARK = "-- app imports --"
+
+def startup_worker(page: Optional[str] = None) -> dict:
+    from streamlit.testing.v1 import AppTest
+    print(IMPORTS_MARK, file=sys.stderr, flush=True)  # -X importtime lines after this are the app's own
+    before = set(sys.modules)
+    t0 = time.perf_counter()
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=300).run()
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    at.run()  # what every widget interaction costs once the process is warm
+    rerun = time.perf_counter() - t0
+    result = {"first_render_s": round(first, 3), "rerun_s": round(rerun, 3)}
+    if page:
+        t0 = time.perf_counter()
+        at.switch_page(page).run()
+        result["page_s"] = round(time.perf_counter() - t0, 3)
+    result.update(modules=len(set(sys.modules) - before), heavy=[m for m in HEAVY_MODULES if m in sys.modules],
+                  errors=[e.value for e in at.exception])
+    return result
+
+def _import_costs(stderr: str, top: int) -> List[tuple]:
+    # -X importtime: "import time: self | cumulative | name", nesting shown by indenting the name
+    lines = stderr.split(IMPORTS_MARK, 1)[-1].splitlines()
+    costs = [(int(m.group(1)), m.group(2)) for m in (re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S.*)", l) for l in lines) if m]
+    return sorted(costs, reverse=True)[:top]
+
+def bench_startup(runs: int, page: Optional[str] = None, top: int = 10):
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "startup-worker"] + (["--page", page] if page else [])
+    results = []
+    for i in range(runs):
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        r = results[-1]
+        print(f"run {i + 1}  first render {r['first_render_s']:>6.2f}s  rerun {r['rerun_s']:>6.3f}s"
+              + (f"  {page} {r['page_s']:>6.3f}s" if page else "")
+              + f"  {r['modules']:>5} modules  heavy: {', '.join(r['heavy']) or '-'}"
+              + (f"  ERRORS {r['errors']}" if r["errors"] else ""))
+    print("Slowest top-level imports during the first render (last run, cumulative):")
+    for us, name in _import_costs(proc.stderr, top):
+        print(f"  {us / 1000:>8.1f} ms  {name}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the app's data paths.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("export", help="peak RSS of legacy vs streaming report export")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench.db')}")
+    p = sub.add_parser("export-worker")
+    p.add_argument("--url", required=True)
+    p.add_argument("--mode", choices=["legacy", "stream"], required=True)
+    p.add_argument("--format", choices=["CSV", "Parquet"], default="CSV")
+    p = sub.add_parser("import", help="throughput of the bulk import pipeline vs per-row form inserts")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--legacy-rows", type=int, default=2_000)
+    p.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_import.db')}")
+    p = sub.add_parser("queries", help="p50/p95 latency and rows scanned for every query app.py issues")
+    p.add_argument("--url", required=True, help="database filled by app/seed.py")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--only", help="run only queries whose name contains this")
+    p.add_argument("--out", default="bench_queries.json")
+    p.add_argument("--compare", help="earlier --out file; exit 1 if any p95 regressed")
+    p.add_argument("--threshold", type=float, default=1.25)
+    p = sub.add_parser("frames", help="grid DataFrame build time/memory: as_dict vs column-wise vs Arrow")
+    p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    p.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench.db')}")
+    p = sub.add_parser("editors", help="N concurrent editors on a few hot rows: lost updates with and without version checks")
+    p.add_argument("--editors", type=int, default=8)
+    p.add_argument("--edits", type=int, default=50, help="edits per editor")
+    p.add_argument("--rows", type=int, default=5, help="rows being edited")
+    p.add_argument("--think", type=float, default=0.01, help="max seconds between loading the form and saving")
+    p.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench.db')}")
+    p = sub.add_parser("changefeed", help="live grid refreshes: full re-query per viewer vs change-feed deltas")
+    p.add_argument("--viewers", type=int, default=50)
+    p.add_argument("--ticks", type=int, default=40, help="refreshes per viewer")
+    p.add_argument("--writes", type=int, default=3, help="rows updated per write")
+    p.add_argument("--write-every", type=int, default=5, help="refreshes between writes")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench.db')}")
+    p = sub.add_parser("deadlines", help="due-soon/overdue alerts: per-render scans vs the scheduler's precomputed table")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--users", type=int, default=50, help="assignees the tasks are spread over")
+    p.add_argument("--edits", type=int, default=1_000, help="tasks edited between runs")
+    p.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_deadlines.db')}")
+    p = sub.add_parser("startup", help="cold start of app.py: time to first render, rerun cost and import profile")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--page", help="also time switching to this page (path relative to app/)")
+    p.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    p = sub.add_parser("startup-worker")
+    p.add_argument("--page")
+    args = parser.parse_args()
+    if args.cmd == "export":
+        bench_export(args.url, args.rows)
+    elif args.cmd == "export-worker":
+        print(json.dumps(export_worker(args.url, args.mode, args.format)))
+    elif args.cmd == "import":
+        bench_import(args.url, args.rows, args.legacy_rows)
+    elif args.cmd == "editors":
+        bench_editors(args.url, args.editors, args.edits, args.rows, args.think)
+    elif args.cmd == "changefeed":
+        bench_changefeed(args.url, args.viewers, args.ticks, args.writes, args.write_every, args.rows)
+    elif args.cmd == "deadlines":
+        bench_deadlines(args.url, args.rows, args.users, args.edits)
+    elif args.cmd == "startup":
+        bench_startup(args.runs, args.page, args.top)
+    elif args.cmd == "startup-worker":
+        print(json.dumps(startup_worker(args.page)))
+    elif args.cmd == "frames":
+        bench_frames(args.url, args.rows)
+    elif args.cmd == "queries":
+        result = bench_queries(args.url, args.repeat, args.only)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.out}")
+        if args.compare:
+            with open(args.compare) as f:
+                if compare_runs(json.load(f), result, args.threshold):
+                    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse
+import logging
+import os
+import select as selectors
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from sqlalchemy import NullPool, create_engine, delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from db import engine
+from models import Contract, Task, ChangeLog
+
+CHANGEFEED_ENABLED = os.environ.get("DATA_GUI_CHANGEFEED", "1").lower() in ("1", "true", "yes", "on")
+CHANGEFEED_POLL_SECONDS = float(os.environ.get("DATA_GUI_CHANGEFEED_POLL_SECONDS", 2.0))  # SQLite poll; Postgres safety net
+CHANGEFEED_BUFFER = int(os.environ.get("DATA_GUI_CHANGEFEED_BUFFER", 10_000))  # changes kept in memory for sessions
+CHANGEFEED_RETENTION_HOURS = float(os.environ.get("DATA_GUI_CHANGEFEED_RETENTION_HOURS", 24))
+LIVE_SECONDS = float(os.environ.get("DATA_GUI_LIVE_SECONDS", 5))  # live grid refresh; 0 = only on interaction
+CHANNEL = "data_gui_changes"
+FEED_MODELS = (Contract, Task)
+GAP_SECONDS = 60  # how long a missing id is waited for: a Postgres writer that started earlier may commit later
+PULL_BATCH = 5_000
+MAX_GAPS = 1_000
+SHARED_SIZE = 1_000
+
+logger = logging.getLogger(__name__)
+
+# --- Triggers: every write to a fed table lands in changelog, whoever made it (app, import, CLI, psql) ---
+_PG_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION changefeed_log() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO changelog (entity, row_id, op) SELECT TG_TABLE_NAME, id, 'D' FROM old_rows;
+  ELSE
+    INSERT INTO changelog (entity, row_id, op) SELECT TG_TABLE_NAME, id, left(TG_OP, 1) FROM new_rows;
+  END IF;
+  PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);  -- delivered on commit, one per table per transaction
+  RETURN NULL;
+END $$ LANGUAGE plpgsql"""
+
+def _setup_postgres(conn, name: str):
+    # Statement-level with transition tables: a batched import logs its rows in one INSERT ... SELECT
+    for op, ref in (("INSERT", "NEW TABLE AS new_rows"), ("UPDATE", "NEW TABLE AS new_rows"), ("DELETE", "OLD TABLE AS old_rows")):
+        trigger = f"{name}_changefeed_{op[:3].lower()}"
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger} ON {name}"))
+        conn.execute(text(f"CREATE TRIGGER {trigger} AFTER {op} ON {name} REFERENCING {ref} "
+                          f"FOR EACH STATEMENT EXECUTE FUNCTION changefeed_log()"))
+
+def _setup_sqlite(conn, name: str):
+    for op, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name}_changefeed_{op[:3].lower()} AFTER {op} ON {name} BEGIN "
+                          f"INSERT INTO changelog (entity, row_id, op) VALUES ('{name}', {row}.id, '{op[0]}'); END"))
+
+def setup(bind=None):
+    with (bind or engine).begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(_PG_FUNCTION))
+            # Tables created before `at` defaulted to UTC used the server's local time
+            conn.execute(text("ALTER TABLE changelog ALTER COLUMN at SET DEFAULT timezone('utc', now())"))
+        for model in FEED_MODELS:
+            (_setup_postgres if conn.dialect.name == "postgresql" else _setup_sqlite)(conn, model.__tablename__)
+
+def record(conn, entity: str, row_id: int = 0):
+    # For tables without triggers that get rebuilt wholesale (the workload counters): readers keyed on `entity` reload
+    conn.execute(insert(ChangeLog.__table__).values(entity=entity, row_id=row_id, op="U"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_notify(:channel, :entity)"), {"channel": CHANNEL, "entity": entity})
+
+# --- In-process feed: one listener thread per process, read by every session ---
+_lock = threading.Lock()
+_stop = threading.Event()
+_start_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_recent: "deque[tuple]" = deque(maxlen=CHANGEFEED_BUFFER)  # (position, entity, row_id)
+_state = {"position": 0, "valid_from": 0, "seq": None, "gaps": {}, "pulls": 0, "changes": 0, "notifies": 0}
+_checkpoints: "deque[tuple]" = deque()  # (monotonic, seq) for pruning
+_shared: "OrderedDict[Any, tuple]" = OrderedDict()
+
+def running() -> bool:
+    return _thread is not None and _thread.is_alive()
+
+def position() -> int:
+    # Process-local counter, not the changelog id: late Postgres commits get a position after earlier ones
+    return _state["position"]
+
+def changes_since(pos: int, entity: str) -> Optional[Set[int]]:
+    # Ids of `entity` rows changed after `pos`; None when that history is gone (feed down, buffer overrun): reload
+    with _lock:
+        if not running() or pos < _state["valid_from"]:
+            return None
+        ids = set()
+        for p, e, row_id in reversed(_recent):
+            if p <= pos:
+                break
+            if e == entity:
+                ids.add(row_id)
+        return ids
+
+def shared(key, entities: Iterable[str], compute: Callable[[], Any]) -> Any:
+    # Process-wide memo for results that only change with these tables (grid counts, the dashboard header):
+    # N sessions with the same key cost one query per change instead of one per rerun each
+    hit = _shared.get(key)
+    if hit is not None and all(changes_since(hit[0], e) == set() for e in entities):
+        return hit[1]
+    pos = position()
+    value = compute()
+    with _lock:
+        _shared[key] = (pos, value)
+        _shared.move_to_end(key)
+        while len(_shared) > SHARED_SIZE:
+            _shared.popitem(last=False)
+    return value
+
+def live_seconds() -> Optional[float]:
+    # run_every for self-refreshing fragments: only while the feed runs. Without it each tick is a full re-query in
+    # every open session, more than refreshing on interaction.
+    return (LIVE_SECONDS or None) if CHANGEFEED_ENABLED and running() else None
+
+def _invalidate():
+    # Anything cached before now may have missed changes
+    _state["valid_from"] = _state["position"]
+    _recent.clear()
+
+def catch_up(bind=None) -> int:
+    # Append changelog rows past the last one seen; ids skipped by a still-open transaction are re-read until they
+    # show up or GAP_SECONDS pass. Called by the listener on every wake-up and after local commits.
+    bind = bind or engine
+    n = 0
+    with _lock, bind.connect() as conn:
+        gaps = _state["gaps"]
+        if _state["seq"] is None:
+            _state["seq"] = conn.execute(select(func.coalesce(func.max(ChangeLog.id), 0))).scalar_one()
+            return 0
+        low = min(gaps) - 1 if gaps else _state["seq"]
+        while True:
+            rows = conn.execute(select(ChangeLog.id, ChangeLog.entity, ChangeLog.row_id)
+                                .where(ChangeLog.id > low).order_by(ChangeLog.id).limit(PULL_BATCH)).all()
+            _state["pulls"] += 1
+            now = time.monotonic()
+            for seq, entity, row_id in rows:
+                if seq <= _state["seq"]:
+                    if gaps.pop(seq, None) is None:
+                        continue  # seen on an earlier pull
+                elif seq - _state["seq"] - 1 > MAX_GAPS:
+                    _invalidate()  # a big rolled-back batch, most likely; too many ids to wait for one by one
+                    _state["seq"] = seq
+                else:
+                    gaps.update((missing, now) for missing in range(_state["seq"] + 1, seq))
+                    _state["seq"] = seq
+                if len(_recent) == _recent.maxlen:
+                    _state["valid_from"] = _recent[0][0]  # about to drop the oldest change
+                _state["position"] += 1
+                _recent.append((_state["position"], entity, row_id))
+                n += 1
+            if len(rows) < PULL_BATCH:
+                break
+            low = rows[-1][0]
+        for missing, seen in list(gaps.items()):
+            if now - seen > GAP_SECONDS:
+                del gaps[missing]  # rolled back, or a sequence value never used
+        _state["changes"] += n
+    return n
+
+def _listen(bind):
+    # A dedicated connection outside the pool, in autocommit so notifications arrive between statements
+    raw = create_engine(bind.url, poolclass=NullPool).raw_connection()
+    conn = raw.driver_connection
+    conn.autocommit = True
+    conn.cursor().execute(f"LISTEN {CHANNEL}")
+    return raw
+
+def _wait(listener, timeout: float):
+    if listener is None:
+        _stop.wait(timeout)
+        return
+    conn = listener.driver_connection
+    if selectors.select([conn], [], [], timeout)[0]:
+        conn.poll()
+        _state["notifies"] += len(conn.notifies)
+        conn.notifies.clear()
+
+def prune(upto: int, bind=None) -> int:
+    # Keeps the newest row: SQLite numbers new rows max(id) + 1, and ids below the feed's position would be skipped
+    with (bind or engine).begin() as conn:
+        newest = select(func.max(ChangeLog.id)).scalar_subquery()
+        return conn.execute(delete(ChangeLog).where(ChangeLog.id <= upto, ChangeLog.id < newest)).rowcount
+
+def _maybe_prune(bind):
+    now = time.monotonic()
+    if not _checkpoints or now - _checkpoints[-1][0] > 60:
+        _checkpoints.append((now, _state["seq"]))
+    cutoff = None
+    while _checkpoints and now - _checkpoints[0][0] > CHANGEFEED_RETENTION_HOURS * 3600:
+        cutoff = _checkpoints.popleft()[1]
+    if cutoff:
+        prune(cutoff, bind)
+
+def _run(bind):
+    listener = None
+    while not _stop.is_set():
+        try:
+            if listener is None and bind.dialect.name == "postgresql":
+                listener = _listen(bind)
+            catch_up(bind)
+            _maybe_prune(bind)
+            _wait(listener, CHANGEFEED_POLL_SECONDS)
+        except Exception:
+            logger.exception("Change feed listener failed; reconnecting in %ss", CHANGEFEED_POLL_SECONDS)
+            if listener is not None:
+                try:
+                    listener.close()
+                except Exception:
+                    pass
+                listener = None
+            with _lock:
+                _invalidate()
+                _state["seq"], _state["gaps"] = None, {}
+            _stop.wait(CHANGEFEED_POLL_SECONDS)
+    if listener is not None:
+        listener.close()
+
+# Local commits: pull right away so the rerun that follows a save already shows it
+def _after_flush(session, flush_context):
+    session.info["changefeed_dirty"] = True
+
+def _after_commit(session):
+    if session.info.pop("changefeed_dirty", False) and running():
+        try:
+            catch_up(session.get_bind())
+        except Exception:
+            logger.exception("Change feed catch-up after commit failed; the listener will pick it up")
+
+def start(bind=None):
+    global _thread
+    bind = bind or engine
+    with _start_lock:
+        if not running():
+            _stop.clear()
+            catch_up(bind)  # start from the current end of the changelog
+            if not event.contains(Session, "after_commit", _after_commit):
+                event.listen(Session, "after_flush", _after_flush)
+                event.listen(Session, "after_commit", _after_commit)
+            _thread = threading.Thread(target=_run, args=(bind,), name="changefeed", daemon=True)
+            _thread.start()
+
+def stop(timeout: float = 5.0):
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
+    with _lock:
+        _invalidate()
+        _state["seq"], _state["gaps"] = None, {}
+        _shared.clear()
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {"running": running(), "position": _state["position"], "changelog_seq": _state["seq"],
+                "open_gaps": len(_state["gaps"]), "buffered": len(_recent), "pulls": _state["pulls"],
+                "changes": _state["changes"], "notifies": _state["notifies"], "shared_results": len(_shared)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Change feed for live grids.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("setup", help="create the changelog triggers")
+    p = sub.add_parser("watch", help="print changes as they arrive")
+    p.add_argument("--seconds", type=float, default=60)
+    args = parser.parse_args()
+    if args.cmd == "setup":
+        setup()
+        print("Change feed triggers installed.")
+    elif args.cmd == "watch":
+        start()
+        pos, end = position(), time.monotonic() + args.seconds
+        while time.monotonic() < end:
+            time.sleep(0.5)
+            with _lock:
+                fresh = [c for c in _recent if c[0] > pos]
+            for p, entity, row_id in fresh:
+                print(f"{p:>8}  {entity:<10} #{row_id}")
+                pos = p
+        print(stats())
+
+if __name__ == "__main__":
+    main()
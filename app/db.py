@@ -1,13 +1,129 @@
-
+import os
+import threading
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import streamlit as st
+from sqlalchemy import event
 from sqlmodel import SQLModel, Session, create_engine
 
-DATABASE_URL = "sqlite:///database.db"  # or your connection string
-engine = create_engine(DATABASE_URL, echo=True)
+import perf
+
+DEFAULT_DATABASE_URL = "sqlite:///database.db"
+
+def _env(name: str, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if isinstance(default, bool):
+        return value.lower() in ("1", "true", "yes", "on")
+    return type(default)(value)
+
+def database_url() -> str:
+    url = os.environ.get("DATA_GUI_DB_URL")
+    if not url:
+        try:
+            url = st.secrets.get("DATA_GUI_DB_URL")
+        except Exception:  # no secrets.toml (local dev, CLIs)
+            url = None
+    return url or DEFAULT_DATABASE_URL
+
+# --- Pool monitoring ---
+_stats_lock = threading.Lock()
+_pool_stats = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0,
+               "waits": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+def _count(key: str, n=1):
+    with _stats_lock:
+        _pool_stats[key] += n
+
+def _record_wait(seconds: float):
+    with _stats_lock:
+        _pool_stats["waits"] += 1
+        _pool_stats["wait_seconds"] += seconds
+        _pool_stats["max_wait_seconds"] = max(_pool_stats["max_wait_seconds"], seconds)
+
+def _track_pool(engine):
+    event.listen(engine, "connect", lambda *a: _count("connects"))
+    event.listen(engine, "checkout", lambda *a: _count("checkouts"))
+    event.listen(engine, "checkin", lambda *a: _count("checkins"))
+    event.listen(engine, "invalidate", lambda *a: _count("invalidations"))
+
+def pool_stats(bind=None) -> dict:
+    pool = (bind or engine).pool
+    with _stats_lock:
+        stats = dict(_pool_stats)
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    stats["status"] = pool.status()
+    return stats
+
+# --- Engine factory ---
+def make_engine(url: Optional[str] = None):
+    url = url or database_url()
+    echo = _env("DATA_GUI_DB_ECHO", False)
+    if url.startswith("sqlite"):
+        busy_ms = _env("DATA_GUI_SQLITE_BUSY_TIMEOUT_MS", 5000)
+        engine = create_engine(url, echo=echo, connect_args={"check_same_thread": False, "timeout": busy_ms / 1000})
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, record):
+            cur = dbapi_conn.cursor()
+            if ":memory:" not in url and url.rstrip("/") != "sqlite:":
+                cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute(f"PRAGMA busy_timeout={int(busy_ms)}")
+            cur.close()
+    else:
+        # Supabase/Neon drop idle connections: ping on checkout and recycle before their timeout
+        engine = create_engine(
+            url, echo=echo, pool_pre_ping=True,
+            pool_size=_env("DATA_GUI_DB_POOL_SIZE", 5),
+            max_overflow=_env("DATA_GUI_DB_MAX_OVERFLOW", 10),
+            pool_timeout=_env("DATA_GUI_DB_POOL_TIMEOUT", 30),
+            pool_recycle=_env("DATA_GUI_DB_POOL_RECYCLE", 1800),
+        )
+    _track_pool(engine)
+    perf.instrument(engine)
+    return engine
+
+@st.cache_resource
+def get_engine():
+    return make_engine()
+
+engine = get_engine()
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
+# --- Sessions ---
+_request_session: ContextVar[Optional[Session]] = ContextVar("request_session", default=None)
+
+@contextmanager
+def request_scope():
+    # One Session, and so one pooled connection, shared by every get_session() in a Streamlit rerun
+    with Session(engine, expire_on_commit=False) as session:
+        t0 = time.perf_counter()
+        session.connection()
+        _record_wait(time.perf_counter() - t0)
+        token = _request_session.set(session)
+        try:
+            yield session
+        finally:
+            _request_session.reset(token)
+
+@contextmanager
 def get_session():
-    with Session(engine) as session:
+    session = _request_session.get()
+    if session is None:
+        with Session(engine) as session:
+            yield session
+        return
+    try:
         yield session
+    except Exception:
+        session.rollback()
+        raise
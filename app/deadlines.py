@@ -0,0 +1,166 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import String, and_, case, delete, event, func, literal, or_, select, update
+from sqlmodel import Session
+
+from db import engine
+from models import Contract, Task, ChangeLog, Notification, DeadlineState
+from reports import DUE_SOON_DAYS, WORKLOAD_SOURCES, upsert_insert
+
+DEADLINES_ENABLED = os.environ.get("DATA_GUI_DEADLINES", "1").lower() in ("1", "true", "yes", "on")
+DEADLINE_INTERVAL_SECONDS = float(os.environ.get("DATA_GUI_DEADLINE_INTERVAL_SECONDS", 900))
+DEADLINE_SLACK_SECONDS = 300  # edits committed this long after their updated_at are still picked up
+ALERT_LIMIT = 50
+STATE = "deadlines"
+KEY = ["entity", "entity_id", "kind", "due_date"]
+
+logger = logging.getLogger(__name__)
+
+# --- Set-based passes; every date range below is a range scan on (status, due_date) ---
+def window_query(model, *where):
+    # Open, owned rows of `model` as notification tuples
+    owner, statuses, _ = WORKLOAD_SOURCES[model]
+    t = model.__table__
+    return (select(t.c[owner], literal(t.name, String), t.c.id, t.c.due_date)
+            .where(t.c.status.in_(statuses), t.c[owner].is_not(None), *where))
+
+def _write(conn, model, kind: str, now: datetime, *where) -> int:
+    # INSERT ... SELECT; an alert already on file (same row, kind and due date) is reopened rather than duplicated
+    src = window_query(model, *where).add_columns(literal(kind, String), literal(now))
+    table = Notification.__table__
+    stmt = upsert_insert(conn)(table).from_select(["user_id", "entity", "entity_id", "due_date", "kind", "created_at"], src)
+    stmt = stmt.on_conflict_do_update(index_elements=KEY, set_={"resolved_at": None, "user_id": stmt.excluded.user_id})
+    return conn.execute(stmt).rowcount
+
+def _resolve(conn, now: datetime, *where) -> int:
+    n = Notification.__table__.c
+    return conn.execute(update(Notification.__table__).where(n.resolved_at.is_(None), *where).values(resolved_at=now)).rowcount
+
+def _state(conn) -> Tuple[Optional[date], Optional[datetime]]:
+    # Row-locked for the whole run: a second scheduler (another process, the CLI) waits instead of double-writing
+    table = DeadlineState.__table__
+    conn.execute(upsert_insert(conn)(table).values(name=STATE).on_conflict_do_nothing(index_elements=["name"]))
+    row = conn.execute(select(table.c.last_day, table.c.last_started_at).where(table.c.name == STATE).with_for_update()).one()
+    return row.last_day, row.last_started_at
+
+def run(bind=None, today: Optional[date] = None) -> Dict[str, Any]:
+    # One pass. A row's alerts can only change when its due date crosses today / today + DUE_SOON_DAYS, or when it is
+    # edited; rows that did neither since the previous run are not read. The first run covers everything.
+    today, now = today or date.today(), datetime.utcnow()
+    soon = today + timedelta(days=DUE_SOON_DAYS)
+    counts = {"resolved": 0, "overdue": 0, "due_soon": 0}
+    t0 = time.perf_counter()
+    with (bind or engine).begin() as conn:
+        last_day, last_started = _state(conn)
+        n = Notification.__table__.c
+        # Lower bounds of the due dates that crossed a threshold since the last run (none on a first run)
+        crossed = last_day is not None and last_day <= today
+        overdue_from = lambda due: [due >= last_day] if crossed else []
+        soon_from = lambda due: [due >= last_day + timedelta(days=DUE_SOON_DAYS)] if crossed else []
+        # Due-soon alerts whose date has now passed become overdue ones
+        counts["resolved"] += _resolve(conn, now, n.kind == "due_soon", n.due_date < today, *overdue_from(n.due_date))
+        if last_started is not None:
+            since = last_started - timedelta(seconds=DEADLINE_SLACK_SECONDS)
+            for model in WORKLOAD_SOURCES:
+                t = model.__table__
+                # Rows deleted outside the ORM (bulk deletes, psql), as logged by the change feed triggers
+                deleted = select(ChangeLog.row_id).where(ChangeLog.entity == t.name, ChangeLog.op == "D", ChangeLog.at > since)
+                counts["resolved"] += conn.execute(delete(Notification.__table__).where(
+                    n.entity == t.name, n.entity_id.in_(deleted))).rowcount
+                # Edited rows: drop their alerts, then write whatever holds now. As a subquery the (few) edited ids
+                # come off the updated_at index instead of being filtered out of the whole due-date range.
+                edited = select(t.c.id).where(t.c.updated_at > since)
+                counts["resolved"] += _resolve(conn, now, n.entity == t.name, n.entity_id.in_(edited))
+                counts["overdue"] += _write(conn, model, "overdue", now, t.c.id.in_(edited), t.c.due_date < today)
+                counts["due_soon"] += _write(conn, model, "due_soon", now, t.c.id.in_(edited),
+                                             t.c.due_date >= today, t.c.due_date < soon)
+        for model in WORKLOAD_SOURCES:
+            due = model.__table__.c.due_date
+            counts["overdue"] += _write(conn, model, "overdue", now, due < today, *overdue_from(due))
+            counts["due_soon"] += _write(conn, model, "due_soon", now, due >= today, due < soon, *soon_from(due))
+        conn.execute(update(DeadlineState.__table__).where(DeadlineState.__table__.c.name == STATE)
+                     .values(last_day=today, last_started_at=now))
+    counts["seconds"] = round(time.perf_counter() - t0, 3)
+    return counts
+
+def rebuild(bind=None, today: Optional[date] = None) -> Dict[str, Any]:
+    # Start over: resolve every open alert and run as if for the first time
+    with (bind or engine).begin() as conn:
+        _state(conn)
+        _resolve(conn, datetime.utcnow())
+        conn.execute(update(DeadlineState.__table__).values(last_day=None, last_started_at=None))
+    return run(bind, today)
+
+# A deleted contract/task takes its alerts with it; bulk Core deletes are caught up by the next run()
+@event.listens_for(Session, "before_flush")
+def _drop_alerts(session, flush_context, instances):
+    for obj in session.deleted:
+        if type(obj) in WORKLOAD_SOURCES:
+            session.execute(delete(Notification).where(Notification.entity == obj.__tablename__,
+                                                       Notification.entity_id == obj.id))
+
+# --- Dashboard read: precomputed, by user ---
+def alerts(session, user_id: int, limit: int = ALERT_LIMIT) -> Tuple[List[Dict[str, Any]], int]:
+    # The page is picked from ix_notification_user_open alone; only those rows are joined for their labels
+    n, c, t = Notification.__table__.c, Contract.__table__.c, Task.__table__.c
+    open_alerts = and_(n.user_id == user_id, n.resolved_at.is_(None))
+    page = (select(n.id, n.kind, n.entity, n.entity_id, n.due_date).where(open_alerts)
+            .order_by(case((n.kind == "overdue", 0), else_=1), n.due_date, n.id).limit(limit).subquery())
+    joined = (page.outerjoin(Contract.__table__, and_(page.c.entity == Contract.__tablename__, c.id == page.c.entity_id))
+              .outerjoin(Task.__table__, and_(page.c.entity == Task.__tablename__, t.id == page.c.entity_id)))
+    what = case((c.id.is_not(None), c.number + " — " + c.title), else_=t.description)
+    q = (select(page.c.kind, page.c.entity, page.c.entity_id, page.c.due_date, what.label("what")).select_from(joined)
+         .where(or_(c.id.is_not(None), t.id.is_not(None)))  # deleted in bulk since the last run
+         .order_by(case((page.c.kind == "overdue", 0), else_=1), page.c.due_date, page.c.id))
+    rows = [dict(r._mapping) for r in session.connection().execute(q)]
+    if len(rows) < limit:
+        return rows, len(rows)
+    return rows, session.connection().execute(select(func.count()).where(open_alerts)).scalar_one()
+
+# --- Background runner (in-process) ---
+_stop = threading.Event()
+_start_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+def _run_forever(bind):
+    while not _stop.is_set():
+        try:
+            logger.info("Deadline scan: %s", run(bind))
+        except Exception:
+            logger.exception("Deadline scan failed; retrying in %ss", DEADLINE_INTERVAL_SECONDS)
+        _stop.wait(DEADLINE_INTERVAL_SECONDS)
+
+def start(bind=None):
+    global _thread
+    with _start_lock:
+        if _thread is None or not _thread.is_alive():
+            _stop.clear()
+            _thread = threading.Thread(target=_run_forever, args=(bind or engine,), name="deadlines", daemon=True)
+            _thread.start()
+
+def stop(timeout: float = 5.0):
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write due-soon/overdue alerts for contracts and tasks.")
+    parser.add_argument("command", choices=["run", "rebuild"])
+    parser.add_argument("--every", type=int, default=0, help="repeat every N seconds instead of running once")
+    parser.add_argument("--today", type=date.fromisoformat, help="pretend it is this day (YYYY-MM-DD)")
+    args = parser.parse_args()
+    result = (rebuild if args.command == "rebuild" else run)(today=args.today)
+    while True:
+        print(datetime.now().isoformat(timespec="seconds"), result)
+        if not args.every:
+            break
+        time.sleep(args.every)
+        result = run(today=args.today)
+
+if __name__ == "__main__":
+    main()
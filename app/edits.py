@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm.exc import StaleDataError
+
+from utils import as_dict
+
+SAVE_RETRIES = 3
+
+class EditConflict(Exception):
+    # Another user saved the same fields after this form was loaded
+    def __init__(self, current, fields: Dict[str, Tuple[Any, Any, Any]]):
+        super().__init__(", ".join(fields) or "row was deleted")
+        self.current = current  # the row as it is now; None when it was deleted
+        self.fields = fields  # name -> (as loaded, mine, theirs)
+
+def snapshot(obj) -> Dict[str, Any]:
+    # What the form was rendered from, version included; kept in session state until the save
+    return as_dict(obj)
+
+def changed(base: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in values.items() if base.get(k) != v}
+
+def save(session, model, base: Dict[str, Any], values: Dict[str, Any]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    # Writes only the fields the user changed relative to `base`. Edits to other fields since then are
+    # kept (a field-level merge); an edit to the same field raises EditConflict. Returns (row, before).
+    mine = changed(base, values)
+    for _ in range(SAVE_RETRIES):
+        obj = session.get(model, base["id"], populate_existing=True)
+        if obj is None:
+            raise EditConflict(None, {})
+        if obj.version != base["version"]:
+            theirs = {k: (base[k], v, getattr(obj, k)) for k, v in mine.items()
+                      if getattr(obj, k) != base[k] and getattr(obj, k) != v}
+            if theirs:
+                raise EditConflict(obj, theirs)
+        if not mine:
+            return obj, None
+        before = as_dict(obj)
+        try:
+            # UPDATE ... SET <changed columns>, version = v + 1 WHERE id = :id AND version = v. Changed and flushed
+            # in a savepoint so a rejected write (a duplicate contract number) leaves the rest of the rerun's session intact.
+            with session.begin_nested():
+                for k, v in mine.items():
+                    setattr(obj, k, v)
+                obj.updated_at = datetime.utcnow()
+                session.flush()
+            session.commit()
+            return obj, before
+        except StaleDataError:
+            # Someone committed between our read and write: re-read and re-check against their row
+            session.rollback()
+    current = session.get(model, base["id"], populate_existing=True)
+    raise EditConflict(current, {k: (base[k], v, getattr(current, k, None)) for k, v in mine.items()})
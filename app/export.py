@@ -0,0 +1,73 @@
+import csv
+import os
+import tempfile
+from typing import Iterable, List, Optional, Any
+from sqlalchemy import select, Integer, Float, Boolean, Date, DateTime, Numeric
+
+from db import engine
+
+EXPORT_BATCH = 5000
+FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/vnd.apache.parquet")}
+
+def export_columns(model) -> List[str]:
+    return list(model.__table__.columns.keys())
+
+def export_query(model, columns: Optional[List[str]] = None, clauses: Iterable[Any] = (), order_by: Iterable[Any] = ()):
+    table = model.__table__
+    cols = [table.c[c] for c in (columns or export_columns(model))]
+    return select(*cols).where(*clauses).order_by(*order_by)
+
+def stream_batches(conn, stmt, batch_size: int = EXPORT_BATCH):
+    # Server-side cursor on Postgres; rows are never materialized beyond one batch
+    result = conn.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for batch in result.partitions():
+        yield batch
+
+def write_csv(stmt, path: str, bind=None, batch_size: int = EXPORT_BATCH) -> int:
+    n = 0
+    with (bind or engine).connect() as conn, open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([c.name for c in stmt.selected_columns])
+        for batch in stream_batches(conn, stmt, batch_size):
+            writer.writerows(batch)
+            n += len(batch)
+    return n
+
+def _arrow_type(pa, sa_type):
+    if isinstance(sa_type, Boolean):
+        return pa.bool_()
+    if isinstance(sa_type, Integer):
+        return pa.int64()
+    if isinstance(sa_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(sa_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(sa_type, Date):
+        return pa.date32()
+    return pa.string()
+
+def write_parquet(stmt, path: str, bind=None, batch_size: int = EXPORT_BATCH) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow).")
+    schema = pa.schema([(c.name, _arrow_type(pa, c.type)) for c in stmt.selected_columns])
+    n = 0
+    with (bind or engine).connect() as conn, pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in stream_batches(conn, stmt, batch_size):
+            arrays = [pa.array(col, type=field.type) for col, field in zip(zip(*batch), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            n += len(batch)
+    return n
+
+def export_to_tempfile(stmt, fmt: str = "CSV", bind=None) -> str:
+    suffix, _ = FORMATS[fmt]
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=f".{suffix}")
+    os.close(fd)
+    try:
+        (write_parquet if fmt == "Parquet" else write_csv)(stmt, path, bind=bind)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
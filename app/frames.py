@@ -0,0 +1,87 @@
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+from sqlalchemy import Boolean, Date, DateTime, Integer
+
+from models import User, Contract, Task
+from queries import Cursor, page_query
+
+# Low-cardinality text columns: stored as codes + a small category table instead of one str object per cell
+CATEGORICAL = {"status", "role", "action", "entity"}
+
+# What each grid shows; heavy or sensitive columns (descriptions, password hashes) stay in the database.
+# Keyset pagination needs id and updated_at in every paged view.
+GRID_COLUMNS = {
+    Contract: ["id", "number", "title", "agency", "naics", "set_aside", "status", "officer_id", "due_date", "updated_at"],
+    Task: ["id", "contract_id", "description", "status", "assigned_to", "due_date", "updated_at", "completed_at"],
+    User: ["id", "name", "email", "role", "active", "created_at"],
+}
+
+def columns(model, names: Optional[List[str]] = None) -> List[Any]:
+    return [model.__table__.c[n] for n in (names or GRID_COLUMNS[model])]
+
+def _series(name: str, values: Sequence[Any], sa_type) -> Any:
+    if name in CATEGORICAL:
+        return pd.Categorical(values)
+    if isinstance(sa_type, Boolean):
+        return pd.array(values, dtype="boolean")
+    if isinstance(sa_type, Integer):
+        return pd.array(values, dtype="Int64")  # nullable: officer_id None stays <NA>, not 3.0
+    if isinstance(sa_type, DateTime):
+        return pd.to_datetime(pd.Series(values, dtype=object))
+    if isinstance(sa_type, Date):
+        return pd.to_datetime(pd.Series(values, dtype=object)).dt.date
+    return pd.array(values, dtype=object)
+
+def to_frame(keys: List[str], rows: Sequence[Tuple], types: Sequence[Any] = ()) -> pd.DataFrame:
+    # Transpose the fetched tuples once and build each column in a single call; no per-row dicts
+    cols = list(zip(*rows)) if rows else [()] * len(keys)
+    types = list(types) or [None] * len(keys)
+    return pd.DataFrame({k: _series(k, v, t) for k, v, t in zip(keys, cols, types)}, columns=keys)
+
+def fetch(session, stmt) -> Tuple[List[str], List[Tuple]]:
+    # SQLAlchemy binds the parameters; rows come straight from the DBAPI cursor. That skips the ORM and the
+    # per-value result processors (on SQLite, Python-side datetime parsing): _series() converts whole columns.
+    result = session.connection().execute(stmt)
+    return list(result.keys()), result.cursor.fetchall()
+
+def read_frame(session, stmt) -> pd.DataFrame:
+    keys, rows = fetch(session, stmt)
+    return to_frame(keys, rows, [c.type for c in stmt.selected_columns])
+
+def seek_frame(session, model, clauses: List[Any], after: Optional[Cursor] = None, page_size: int = 50,
+               names: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Optional[Cursor]]:
+    stmt = page_query(model, clauses, after, page_size + 1, columns(model, names))
+    df = read_frame(session, stmt)
+    next_cursor = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        next_cursor = (df["updated_at"].iloc[-1].to_pydatetime(), int(df["id"].iloc[-1]))
+    return df, next_cursor
+
+def read_frame_arrow(session, stmt) -> pd.DataFrame:
+    # Arrow-backed columns via pandas' own reader; needs pyarrow
+    return pd.read_sql(stmt, session.connection(), dtype_backend="pyarrow")
+
+def merge_page(session, model, clauses: List[Any], df: pd.DataFrame, changed: Iterable[int], after: Optional[Cursor],
+               next_cursor: Optional[Cursor], page_size: int, names: Optional[List[str]] = None
+               ) -> Optional[Tuple[pd.DataFrame, Optional[Cursor]]]:
+    # Applies a change-feed delta to a cached keyset page: re-reads only the changed ids (still matching the filters
+    # and inside this page's window) and re-sorts. None when rows left a full page and the ones that would move up
+    # from the next page are unknown; the caller refetches.
+    changed = list(changed)
+    fresh = read_frame(session, page_query(model, clauses + [model.id.in_(changed)], after, len(changed), columns(model, names)))
+    kept = df[~df["id"].isin(changed)]
+    merged = pd.concat([fresh, kept], ignore_index=True) if len(fresh) else kept
+    for name in CATEGORICAL.intersection(merged.columns):
+        merged[name] = pd.Categorical(merged[name])  # concat of differing categories falls back to object
+    merged = merged.sort_values(["updated_at", "id"], ascending=False, ignore_index=True)
+    if next_cursor is not None:
+        # Below the old last row the next page's rows compete, and only the database knows them
+        at, last_id = next_cursor
+        merged = merged[(merged["updated_at"] > at) | ((merged["updated_at"] == at) & (merged["id"] >= last_id))]
+        if len(merged) < page_size:
+            return None
+    if len(merged) > page_size or next_cursor is not None:
+        merged = merged.iloc[:page_size]
+        return merged.reset_index(drop=True), (merged["updated_at"].iloc[-1].to_pydatetime(), int(merged["id"].iloc[-1]))
+    return merged, None
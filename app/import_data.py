@@ -0,0 +1,240 @@
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterator, List, Literal, Optional, Tuple
+from pydantic import ConfigDict, ValidationError, create_model
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+import audit
+from db import engine
+from models import User, Contract, Task, AuditLog
+from reports import upsert_insert, refresh_summary, refresh_workload
+from utils import find_user_by_email
+
+IMPORT_BATCH = int(os.environ.get("DATA_GUI_IMPORT_BATCH", 1000))
+
+# Columns accepted per entity; *_email / contract_number are resolved to ids before validation
+IMPORT_COLUMNS = {
+    "Contract": ["number", "title", "agency", "naics", "set_aside", "description", "status", "officer_id",
+                 "officer_email", "due_date"],
+    "Task": ["contract_id", "contract_number", "description", "status", "assigned_to", "assigned_to_email",
+             "due_date", "completed_at"],
+}
+REQUIRED_COLUMNS = {"Contract": {"number", "title"}, "Task": {"description"}}
+STATUSES = {
+    "Contract": ["Draft", "Assigned", "In Progress", "Submitted", "Awarded", "Not Awarded", "Closed"],
+    "Task": ["To Do", "In Progress", "Blocked", "Done"],
+}
+MODELS = {"Contract": Contract, "Task": Task}
+
+def _row_schema(entity, model):
+    # Plain pydantic copy of the table model's fields: same rules, without SQLModel's per-attribute overhead.
+    # Spreadsheets hand contract numbers and NAICS codes over as numbers; text fields take them as text.
+    fields = {n: (f.annotation, f) for n, f in model.model_fields.items()}
+    fields["status"] = (Literal[tuple(STATUSES[entity])], model.model_fields["status"])
+    return create_model(f"{model.__name__}Row", __config__=ConfigDict(coerce_numbers_to_str=True), **fields)
+
+SCHEMAS = {entity: _row_schema(entity, model) for entity, model in MODELS.items()}
+
+Row = Tuple[int, Dict[str, Any]]  # (line number in the source file, values)
+Valid = Tuple[int, Dict[str, Any], FrozenSet[str]]  # ... plus the columns the file gave a value for
+
+def _column(name) -> str:
+    return str(name or "").strip().lower().replace(" ", "_")
+
+def _clean(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+# --- Readers: yield chunks of rows without loading the whole file ---
+def _read_csv(source, batch_size: int) -> Iterator[List[Row]]:
+    import pandas as pd
+    line = 2  # line 1 is the header
+    for chunk in pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=batch_size):
+        chunk.columns = [_column(c) for c in chunk.columns]
+        records = chunk.to_dict("records")
+        yield [(line + i, r) for i, r in enumerate(records)]
+        line += len(records)
+
+def _read_xlsx(source, batch_size: int) -> Iterator[List[Row]]:
+    from openpyxl import load_workbook
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [_column(c) for c in next(rows, ())]
+        batch = []
+        for line, values in enumerate(rows, start=2):
+            if not any(v is not None for v in values):
+                continue
+            # Whole numbers may come back as floats (541511.0); keep them integral so text fields read "541511"
+            batch.append((line, {k: int(v) if isinstance(v, float) and v.is_integer() else v for k, v in zip(header, values)}))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        wb.close()
+
+def read_chunks(source, filename: str, batch_size: int = IMPORT_BATCH) -> Iterator[List[Row]]:
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return _read_xlsx(source, batch_size)
+    if ext == ".csv":
+        return _read_csv(source, batch_size)
+    raise ValueError(f"Unsupported file type {ext!r}; use .csv or .xlsx")
+
+# --- Validation ---
+def _resolve(conn, entity: str, batch: List[Row], emails: Dict[str, int]) -> Tuple[List[Row], List[Tuple[int, str]]]:
+    # Map human keys (emails, contract numbers) to ids, one query per batch for contracts
+    numbers = {}
+    if entity == "Task":
+        wanted = {str(r["contract_number"]).strip() for _, r in batch if _clean(r.get("contract_number"))}
+        if wanted:
+            c = Contract.__table__.c
+            numbers = dict(conn.execute(select(c.number, c.id).where(c.number.in_(wanted))).all())
+    refs = {"Contract": [("officer_email", "officer_id", emails)],
+            "Task": [("assigned_to_email", "assigned_to", emails), ("contract_number", "contract_id", numbers)]}[entity]
+    out, errors = [], []
+    for line, raw in batch:
+        row = {k: _clean(v) for k, v in raw.items() if k in IMPORT_COLUMNS[entity]}
+        try:
+            for src, dest, lookup in refs:
+                key = row.pop(src, None)
+                if key is not None and row.get(dest) is None:
+                    key = str(key).lower() if src.endswith("email") else str(key)
+                    if key not in lookup:
+                        raise LookupError(f"{src} {key!r} not found")
+                    row[dest] = lookup[key]
+        except LookupError as e:
+            errors.append((line, str(e)))
+            continue
+        out.append((line, row))
+    return out, errors
+
+def validate(entity: str, rows: List[Row], now: datetime) -> Tuple[List[Valid], List[Tuple[int, str]]]:
+    schema = SCHEMAS[entity]
+    fields = {c for c in MODELS[entity].__table__.columns.keys() if c != "id"}
+    valid, errors = [], []
+    for line, row in rows:
+        try:
+            obj = schema.model_validate({k: v for k, v in row.items() if v is not None})
+        except ValidationError as e:
+            errors.append((line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())))
+            continue
+        data = obj.model_dump(include=fields)
+        data["created_at"] = data["updated_at"] = now
+        if entity == "Task" and data["status"] == "Done" and not data["completed_at"]:
+            data["completed_at"] = now
+        valid.append((line, data, frozenset(obj.model_fields_set & fields)))
+    return valid, errors
+
+# --- Writers ---
+def _statement(conn, entity: str, update_cols: List[str]):
+    # Executed with a list of parameter sets: compiled once, sent as executemany/multi-row VALUES by the driver
+    table = MODELS[entity].__table__
+    if entity != "Contract":
+        return insert(table)
+    # Re-importing the same export updates contracts in place, keyed on their solicitation number
+    stmt = upsert_insert(conn)(table)
+    # Bumping the version makes open edit forms on these rows see a conflict instead of overwriting the import
+    return stmt.on_conflict_do_update(index_elements=["number"],
+                                      set_={**{c: stmt.excluded[c] for c in update_cols + ["updated_at"]},
+                                            "version": table.c.version + 1})
+
+def _write(conn, entity: str, rows: List[Valid]) -> Tuple[int, List[Tuple[int, str]]]:
+    if entity == "Contract":
+        # One statement may not touch the same number twice on Postgres; the last row wins, as it would row by row
+        rows = list({r["number"]: (line, r, cols) for line, r, cols in rows}.values())
+    # A blank cell keeps the contract's current value rather than resetting it to the model default,
+    # so rows are written with one statement per set of columns they fill in
+    groups: Dict[Optional[FrozenSet[str]], List[Row]] = {}
+    for line, row, cols in rows:
+        groups.setdefault(cols if entity == "Contract" else None, []).append((line, row))
+    written, errors = 0, []
+    for cols, group in groups.items():
+        stmt = _statement(conn, entity, sorted(cols - {"number"}) if cols else [])
+        n, failed = _execute(conn, stmt, group)
+        written += n
+        errors += failed
+    return written, errors
+
+def _execute(conn, stmt, rows: List[Row]) -> Tuple[int, List[Tuple[int, str]]]:
+    try:
+        with conn.begin_nested():
+            conn.execute(stmt, [r for _, r in rows])
+        return len(rows), []
+    except DBAPIError:
+        pass
+    # A constraint failed somewhere in the batch: retry row by row to isolate the offenders
+    written, errors = 0, []
+    for line, row in rows:
+        try:
+            with conn.begin_nested():
+                conn.execute(stmt, row)
+            written += 1
+        except DBAPIError as e:
+            errors.append((line, str(e.orig).strip().splitlines()[0]))
+    return written, errors
+
+def import_file(source, entity: str, filename: Optional[str] = None, user=None, bind=None,
+                batch_size: int = IMPORT_BATCH) -> Dict[str, Any]:
+    bind = bind or engine
+    filename = filename or getattr(source, "name", None) or str(source)
+    t0 = time.perf_counter()
+    result = {"entity": entity, "file": os.path.basename(filename), "rows": 0, "written": 0, "batches": 0, "errors": []}
+    with bind.connect() as conn:
+        u = User.__table__.c
+        emails = {e.lower(): i for e, i in conn.execute(select(u.email, u.id)).all()}
+    for batch in read_chunks(source, filename, batch_size):
+        if result["batches"] == 0:
+            missing = REQUIRED_COLUMNS[entity] - set(batch[0][1])
+            if missing:
+                raise ValueError(f"Missing required column(s): {', '.join(sorted(missing))}")
+        now = datetime.utcnow()
+        with bind.begin() as conn:
+            rows, errors = _resolve(conn, entity, batch, emails)
+            rows, invalid = validate(entity, rows, now)
+            written, failed = _write(conn, entity, rows)
+            errors = sorted(errors + invalid + failed)
+            # One summarized audit entry per batch, committed with the batch itself
+            entry = audit.make_entry(user, "import", entity, after={
+                "file": result["file"], "lines": [batch[0][0], batch[-1][0]], "written": written, "errors": len(errors)})
+            conn.execute(insert(AuditLog.__table__).values(audit.to_row(entry)))
+        result["rows"] += len(batch)
+        result["written"] += written
+        result["batches"] += 1
+        result["errors"] += errors
+    # Core writes bypass the before_flush listeners that keep the report summary and workload current
+    with Session(bind) as s:
+        refresh_summary(s)
+        refresh_workload(s)
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import contracts or tasks from CSV/XLSX.")
+    parser.add_argument("entity", choices=sorted(MODELS))
+    parser.add_argument("path")
+    parser.add_argument("--user", help="email of the user recorded in the audit log")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH)
+    args = parser.parse_args()
+    user = None
+    if args.user:
+        with Session(engine) as s:
+            user = find_user_by_email(s, args.user)
+        if user is None:
+            parser.error(f"no user with email {args.user}")
+    result = import_file(args.path, args.entity, user=user, batch_size=args.batch_size)
+    for line, msg in result["errors"]:
+        print(f"line {line}: {msg}")
+    print(f"{result['written']} of {result['rows']} {args.entity} rows imported in {result['batches']} batches "
+          f"({result['seconds']}s), {len(result['errors'])} errors")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 
 from sqlmodel import select
-from .db import create_db_and_tables, get_session
-from .models import User, Contract, Task
+from db import create_db_and_tables, get_session
+from models import User, Contract, Task
 from datetime import date
 
 def main():
@@ -1,33 +1,161 @@
-from typing import Optional, List, Literal
-from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from typing import Optional, Literal
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Index, event, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlmodel import SQLModel, Field
+from datetime import datetime, date
 
 Role = Literal["admin", "officer", "viewer"]
 
+def _has_trgm(ddl, target, bind, **kw):
+    return bind is None or bind.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+def version_column() -> Column:
+    # Row version for optimistic locking: the ORM adds "AND version = :loaded" to every UPDATE/DELETE
+    # and raises StaleDataError when another writer got there first
+    return Column("version", Integer, nullable=False, default=1, server_default=text("1"))
+
+_contract_version, _task_version = version_column(), version_column()
+
+class utcnow(FunctionElement):
+    # Server-side UTC timestamp, comparable with the app's datetime.utcnow() values whatever the server's time zone
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+@compiles(utcnow)
+def _utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # UTC on SQLite
+
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     email: str = Field(index=True, unique=True)
-    hashed_password: str
-    role: Role = "viewer"
-    contracts: List["Contract"] = Relationship(back_populates="owner")
+    hashed_password: Optional[str] = None
+    role: Role = Field(default="viewer", sa_type=String)
+    active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Contract(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_contract_number", "number", unique=True),
+        Index("ix_contract_updated", "updated_at", "id"),
+        Index("ix_contract_officer_updated", "officer_id", "updated_at", "id"),
+        Index("ix_contract_status_updated", "status", "updated_at", "id"),
+        Index("ix_contract_status_due", "status", "due_date"),
+        Index("ix_contract_naics", "naics"),
+        # "Agency contains" is a LIKE '%...%'; only a trigram index can serve it (Postgres only)
+        Index("ix_contract_agency_trgm", "agency", postgresql_using="gin",
+              postgresql_ops={"agency": "gin_trgm_ops"}).ddl_if(dialect="postgresql", callable_=_has_trgm),
+    )
+    __mapper_args__ = {"version_id_col": _contract_version}
     id: Optional[int] = Field(default=None, primary_key=True)
+    number: str
     title: str
+    agency: Optional[str] = None
+    naics: Optional[str] = None
+    set_aside: Optional[str] = None
     description: Optional[str] = None
+    status: str = "Draft"
+    officer_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    due_date: Optional[date] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    owner_id: Optional[int] = Field(default=None, foreign_key="user.id")
-    owner: Optional[User] = Relationship(back_populates="contracts")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1, sa_column=_contract_version)
 
 class Task(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_task_updated", "updated_at", "id"),
+        Index("ix_task_assignee_updated", "assigned_to", "updated_at", "id"),
+        Index("ix_task_status_completed", "status", "completed_at"),
+        Index("ix_task_status_due", "status", "due_date"),
+        Index("ix_task_contract", "contract_id"),
+    )
+    __mapper_args__ = {"version_id_col": _task_version}
     id: Optional[int] = Field(default=None, primary_key=True)
-    description: str
-    completed: bool = False
     contract_id: Optional[int] = Field(default=None, foreign_key="contract.id")
+    description: str
+    status: str = "To Do"
+    assigned_to: Optional[int] = Field(default=None, foreign_key="user.id")
+    due_date: Optional[date] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    version: int = Field(default=1, sa_column=_task_version)
 
 class AuditLog(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_auditlog_at", "at"),
+        Index("ix_auditlog_user_at", "user_id", "at"),
+        Index("ix_auditlog_entity", "entity", "entity_id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
+    at: datetime = Field(default_factory=datetime.utcnow)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    user_name: Optional[str] = None
     action: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    entity: Optional[str] = None
+    entity_id: Optional[int] = None
+    before: Optional[str] = None
+    after: Optional[str] = None
+
+class ChangeLog(SQLModel, table=True):
+    # One row per inserted/updated/deleted contract or task, written by triggers (changefeed.py).
+    # id is the feed position; rows are pruned after DATA_GUI_CHANGEFEED_RETENTION_HOURS.
+    id: Optional[int] = Field(default=None, sa_column=Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True))
+    entity: str
+    row_id: int
+    op: str  # I, U or D
+    at: datetime = Field(sa_column=Column(DateTime, nullable=False, server_default=utcnow()))
+
+class Notification(SQLModel, table=True):
+    # Due-soon/overdue alerts written by deadlines.py, one per row, kind and due date. resolved_at is set when the
+    # row is finished, re-dated or reassigned, and when a due-soon alert turns into an overdue one.
+    __table_args__ = (
+        Index("ix_notification_key", "entity", "entity_id", "kind", "due_date", unique=True),
+        Index("ix_notification_user_open", "user_id", "resolved_at", "due_date"),
+        Index("ix_notification_kind_due", "kind", "due_date"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    entity: str
+    entity_id: int
+    kind: str  # due_soon or overdue
+    due_date: date
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    resolved_at: Optional[datetime] = None
+
+class DeadlineState(SQLModel, table=True):
+    # deadlines.py bookkeeping: the next run only looks at rows edited since last_started_at and due dates that
+    # crossed a threshold since last_day
+    name: str = Field(primary_key=True)
+    last_day: Optional[date] = None
+    last_started_at: Optional[datetime] = None
+
+@event.listens_for(SQLModel.metadata, "before_create")
+def create_extensions(target, connection, **kw):
+    # Managed Postgres (Supabase/Neon) ships pg_trgm; bare installs may not have contrib
+    if connection.dialect.name == "postgresql" and connection.execute(
+            text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+class ReportSummary(SQLModel, table=True):
+    # Per-status row counts for Contract/Task, kept current by reports.py on every flush
+    entity: str = Field(primary_key=True)
+    status: str = Field(primary_key=True)
+    count: int = 0
+
+class OfficerWorkload(SQLModel, table=True):
+    # Open/overdue/due-soon counts per officer, kept current by reports.py on every flush.
+    # officer_id 0 is a marker row: its as_of is the day of the last full reconciliation.
+    officer_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    open_contracts: int = 0
+    overdue_contracts: int = 0
+    due_week_contracts: int = 0
+    open_tasks: int = 0
+    overdue_tasks: int = 0
+    due_week_tasks: int = 0
+    as_of: date = Field(default_factory=date.today)
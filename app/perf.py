@@ -0,0 +1,259 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import event
+
+PERF_ENABLED = os.environ.get("DATA_GUI_PERF", "1").lower() in ("1", "true", "yes", "on")
+PERF_RERUNS = int(os.environ.get("DATA_GUI_PERF_RERUNS", 500))  # ring buffer of recent reruns
+PERF_SLOW_MS = float(os.environ.get("DATA_GUI_PERF_SLOW_MS", 250))  # statements slower than this are logged
+PERF_N_PLUS_ONE = int(os.environ.get("DATA_GUI_PERF_N_PLUS_ONE", 10))  # same SELECT this often in one rerun
+METRICS_PORT = int(os.environ.get("DATA_GUI_METRICS_PORT", 0))  # 0 = no /metrics endpoint
+MAX_STATEMENTS = 500
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_reruns: deque = deque(maxlen=PERF_RERUNS)
+_statements: Dict[str, Dict[str, float]] = {}
+_pages: Dict[str, Dict[str, Any]] = {}
+_sections: Dict[str, Dict[str, Any]] = {}
+_queries: Dict[str, Any] = {}
+_n_plus_one = Counter()
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar("perf_rerun", default=None)
+_server: Optional[ThreadingHTTPServer] = None
+
+# --- Statement fingerprints: literals and expanded IN lists collapse, so one query shape = one row ---
+_SPACE = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\([^)]+\)s)\s*,)+\s*(?:\?|%s|%\([^)]+\)s)\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    sql = _SPACE.sub(" ", statement).strip()
+    return _PARAM_LIST.sub("(...)", _LITERAL.sub("?", sql))
+
+def _histogram() -> Dict[str, Any]:
+    return {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0, "max": 0.0}
+
+def _observe(h: Dict[str, Any], seconds: float):
+    for i, le in enumerate(BUCKETS):
+        if seconds <= le:
+            h["buckets"][i] += 1
+    h["sum"] += seconds
+    h["count"] += 1
+    h["max"] = max(h["max"], seconds)
+
+_queries.update(_histogram())
+
+# --- SQLAlchemy cursor events ---
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("perf_started", []).append(time.perf_counter())
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["perf_started"].pop()
+    # psycopg2 reports rows for SELECTs too; sqlite3 only for writes (-1 otherwise)
+    rowcount = getattr(cursor, "rowcount", -1)
+    record_query(statement, seconds, rowcount if rowcount is not None and rowcount >= 0 else None)
+
+def _on_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("perf_started"):
+        conn.info["perf_started"].pop()
+
+def instrument(engine):
+    if not PERF_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+def record_query(statement: str, seconds: float, rows: Optional[int] = None):
+    fp = fingerprint(statement)
+    with _lock:
+        _observe(_queries, seconds)
+        stats = _statements.get(fp)
+        if stats is None:
+            if len(_statements) >= MAX_STATEMENTS:
+                fp = "(other statements)"
+            stats = _statements.setdefault(fp, {"calls": 0, "seconds": 0.0, "max": 0.0, "rows": 0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["rows"] += rows or 0
+    run = _current.get()
+    if run is not None:
+        run["queries"] += 1
+        run["query_seconds"] += seconds
+        run["rows"] += rows or 0
+        run["statements"][fp] += 1
+        if seconds > run["slowest"][1]:
+            run["slowest"] = (fp, seconds)
+    if seconds * 1000 >= PERF_SLOW_MS:
+        logger.warning("Slow query (%.0f ms): %s", seconds * 1000, fp[:500])
+
+# --- Reruns and sections ---
+def _record_section(run: Optional[Dict[str, Any]], name: str, seconds: float):
+    with _lock:
+        _observe(_sections.setdefault(name, _histogram()), seconds)
+    if run is not None:
+        run["sections"][name] = run["sections"].get(name, 0.0) + seconds
+
+def _close_section(run: Dict[str, Any]):
+    if run["open"]:
+        name, started = run["open"]
+        _record_section(run, name, time.perf_counter() - started)
+        run["open"] = None
+
+@contextmanager
+def rerun(page: str = ""):
+    # One Streamlit script run: queries on this thread are attributed to it until it ends (st.stop/st.rerun included)
+    run = {"started": datetime.now(), "page": page, "queries": 0, "query_seconds": 0.0, "rows": 0,
+           "sections": {}, "statements": Counter(), "slowest": ("", 0.0), "open": None}
+    token = _current.set(run)
+    t0 = time.perf_counter()
+    try:
+        yield run
+    finally:
+        _close_section(run)
+        _current.reset(token)
+        _finish(run, time.perf_counter() - t0)
+
+def enter_section(name: str):
+    # Times everything from here to the next enter_section() or the end of the rerun
+    run = _current.get()
+    if run is None:
+        return
+    _close_section(run)
+    run["page"] = name
+    run["open"] = (name, time.perf_counter())
+
+@contextmanager
+def timed(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_section(_current.get(), name, time.perf_counter() - t0)
+
+def _finish(run: Dict[str, Any], seconds: float):
+    suspects = [(fp, n) for fp, n in run["statements"].most_common() if n >= PERF_N_PLUS_ONE and fp[:6].upper() == "SELECT"]
+    for fp, n in suspects:
+        logger.warning("Possible N+1 on %s: %d x %s", run["page"] or "(no page)", n, fp[:300])
+    summary = {"started": run["started"], "page": run["page"], "ms": round(seconds * 1000, 1),
+               "queries": run["queries"], "query_ms": round(run["query_seconds"] * 1000, 1), "rows": run["rows"],
+               "distinct": len(run["statements"]), "slowest": run["slowest"][0][:200],
+               "slowest_ms": round(run["slowest"][1] * 1000, 1),
+               "sections": {k: round(v * 1000, 1) for k, v in run["sections"].items()}, "n_plus_one": suspects}
+    with _lock:
+        _reruns.append(summary)
+        _observe(_pages.setdefault(run["page"], _histogram()), seconds)
+        for fp, _ in suspects:
+            _n_plus_one[fp] += 1
+
+# --- Read side: admin page and /metrics ---
+def _stats_rows(items, key: str) -> List[Dict[str, Any]]:
+    return [{key: name, "calls": s["count"], "total_ms": round(s["sum"] * 1000, 1),
+             "avg_ms": round(s["sum"] / s["count"] * 1000, 2) if s["count"] else 0.0, "max_ms": round(s["max"] * 1000, 1)}
+            for name, s in items]
+
+def recent_reruns(limit: int = 100) -> List[Dict[str, Any]]:
+    with _lock:
+        return list(_reruns)[-limit:][::-1]
+
+def slowest_statements(limit: int = 25) -> List[Dict[str, Any]]:
+    with _lock:
+        items = sorted(_statements.items(), key=lambda kv: -kv[1]["seconds"])[:limit]
+    return [{"statement": fp, "calls": s["calls"], "total_ms": round(s["seconds"] * 1000, 1),
+             "avg_ms": round(s["seconds"] / s["calls"] * 1000, 2), "max_ms": round(s["max"] * 1000, 1),
+             "rows": s["rows"]} for fp, s in items]
+
+def section_stats() -> List[Dict[str, Any]]:
+    with _lock:
+        items = sorted(_sections.items(), key=lambda kv: -kv[1]["sum"])
+    return _stats_rows(items, "section")
+
+def page_stats() -> List[Dict[str, Any]]:
+    with _lock:
+        items = sorted(_pages.items(), key=lambda kv: -kv[1]["sum"])
+    return _stats_rows(items, "page")
+
+def n_plus_one_suspects() -> List[Dict[str, Any]]:
+    with _lock:
+        return [{"statement": fp, "reruns": n} for fp, n in _n_plus_one.most_common()]
+
+def reset():
+    with _lock:
+        _reruns.clear()
+        _statements.clear()
+        _pages.clear()
+        _sections.clear()
+        _n_plus_one.clear()
+        _queries.update(_histogram())
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _histogram_lines(name: str, help_text: str, series: Dict[str, Dict[str, Any]], label: Optional[str]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, h in series.items():
+        base = f'{label}="{_label(key)}",' if label else ""
+        for le, n in zip(BUCKETS, h["buckets"]):
+            lines.append(f'{name}_bucket{{{base}le="{le}"}} {n}')
+        lines.append(f'{name}_bucket{{{base}le="+Inf"}} {h["count"]}')
+        suffix = f"{{{base.rstrip(',')}}}" if base else ""
+        lines += [f"{name}_sum{suffix} {h['sum']:.6f}", f"{name}_count{suffix} {h['count']}"]
+    return lines
+
+def render_metrics(gauges: Optional[Dict[str, Any]] = None, top: int = 20) -> str:
+    # Prometheus text exposition format (0.0.4), which OpenMetrics scrapers also accept
+    with _lock:
+        lines = _histogram_lines("data_gui_rerun_seconds", "Streamlit rerun duration by page.", dict(_pages), "page")
+        lines += _histogram_lines("data_gui_section_seconds", "Time spent in app sections and grids.", dict(_sections), "section")
+        lines += _histogram_lines("data_gui_query_seconds", "SQL statement execution time.", {"": _queries}, None)
+        top_statements = sorted(_statements.items(), key=lambda kv: -kv[1]["seconds"])[:top]
+        n_plus_one = sum(_n_plus_one.values())
+    lines += ["# HELP data_gui_statement_seconds_total Execution time of the slowest statement shapes.",
+              "# TYPE data_gui_statement_seconds_total counter"]
+    lines += [f'data_gui_statement_seconds_total{{statement="{_label(fp[:200])}"}} {s["seconds"]:.6f}' for fp, s in top_statements]
+    lines += ["# HELP data_gui_statement_calls_total Executions of the slowest statement shapes.",
+              "# TYPE data_gui_statement_calls_total counter"]
+    lines += [f'data_gui_statement_calls_total{{statement="{_label(fp[:200])}"}} {s["calls"]}' for fp, s in top_statements]
+    lines += ["# HELP data_gui_n_plus_one_total Reruns that repeated one SELECT shape suspiciously often.",
+              "# TYPE data_gui_n_plus_one_total counter", f"data_gui_n_plus_one_total {n_plus_one}"]
+    for name, value in (gauges or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines += [f"# TYPE data_gui_{name} gauge", f"data_gui_{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+def serve_metrics(port: int, gauges: Callable[[], Dict[str, Any]] = dict):
+    # Plain-HTTP /metrics for Prometheus, once per process; Streamlit itself can't add routes
+    global _server
+    with _lock:
+        if _server is not None:
+            return
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_metrics(gauges()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+        _server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
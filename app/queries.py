@@ -0,0 +1,79 @@
+from typing import Optional, List, Tuple, Any
+from datetime import date, datetime
+from sqlalchemy import func, and_, or_
+from sqlmodel import select
+
+from models import Contract, Task
+
+PAGE_SIZES = [25, 50, 100, 250]
+LOOKUP_LIMIT = 20
+
+Cursor = Tuple[datetime, int]
+
+# --- Filters (shared by grids, counts and exports) ---
+def contract_filters(status: Optional[str] = None, officer_id: Optional[int] = None,
+                     agency: Optional[str] = None, naics: Optional[str] = None) -> List[Any]:
+    clauses = []
+    if status:
+        clauses.append(Contract.status == status)
+    if officer_id is not None:
+        clauses.append(Contract.officer_id == officer_id)
+    if agency:
+        clauses.append(Contract.agency.contains(agency))
+    if naics:
+        clauses.append(Contract.naics == naics)
+    return clauses
+
+def task_filters(status: Optional[str] = None, assigned_to: Optional[int] = None,
+                 due_before: Optional[date] = None, contract_id: Optional[int] = None) -> List[Any]:
+    clauses = []
+    if status:
+        clauses.append(Task.status == status)
+    if assigned_to is not None:
+        clauses.append(Task.assigned_to == assigned_to)
+    if due_before:
+        clauses.append(Task.due_date <= due_before)
+    if contract_id is not None:
+        clauses.append(Task.contract_id == contract_id)
+    return clauses
+
+# --- Keyset pagination on (updated_at, id), newest first ---
+def count_rows(session, model, clauses: List[Any]) -> int:
+    return session.exec(select(func.count()).select_from(model).where(*clauses)).one()
+
+def page_query(model, clauses: List[Any], after: Optional[Cursor] = None, limit: int = 50, columns: List[Any] = ()):
+    q = select(*columns) if columns else select(model)
+    q = q.where(*clauses)
+    if after is not None:
+        at, last_id = after
+        q = q.where(or_(model.updated_at < at, and_(model.updated_at == at, model.id < last_id)))
+    return q.order_by(model.updated_at.desc(), model.id.desc()).limit(limit)
+
+def seek_page(session, model, clauses: List[Any], after: Optional[Cursor] = None, page_size: int = 50):
+    # Fetch one extra row to learn whether a next page exists without a second query
+    rows = session.exec(page_query(model, clauses, after, page_size + 1)).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = (rows[-1].updated_at, rows[-1].id) if has_more else None
+    return rows, next_cursor
+
+# --- Bounded search-as-you-type lookups for edit pickers ---
+def lookup_contracts(session, term: str = "", limit: int = LOOKUP_LIMIT) -> List[Contract]:
+    q = select(Contract)
+    term = term.strip().lstrip("#")
+    if term:
+        match = or_(Contract.number.contains(term), Contract.title.contains(term))
+        if term.isdigit():
+            match = or_(Contract.id == int(term), match)
+        q = q.where(match)
+    return session.exec(q.order_by(Contract.updated_at.desc(), Contract.id.desc()).limit(limit)).all()
+
+def lookup_tasks(session, term: str = "", limit: int = LOOKUP_LIMIT) -> List[Task]:
+    q = select(Task)
+    term = term.strip().lstrip("#")
+    if term:
+        match = Task.description.contains(term)
+        if term.isdigit():
+            match = or_(Task.id == int(term), Task.contract_id == int(term), match)
+        q = q.where(match)
+    return session.exec(q.order_by(Task.updated_at.desc(), Task.id.desc()).limit(limit)).all()
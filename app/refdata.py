@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional, Tuple
+import streamlit as st
+from sqlmodel import select
+
+from db import get_session
+from models import User
+
+REFDATA_TTL = 300  # seconds; writes through the app invalidate explicitly
+
+Options = Tuple[List[str], Dict[int, int]]  # ("id:name" labels, user id -> position in labels)
+
+def _options(users: Dict[int, str], ids: List[int]) -> Options:
+    return [f"{i}:{users[i]}" for i in ids], {i: n for n, i in enumerate(ids)}
+
+@st.cache_data(ttl=REFDATA_TTL, show_spinner=False)
+def reference_data() -> dict:
+    with get_session() as s:
+        rows = s.exec(select(User.id, User.name, User.role).where(User.active == True).order_by(User.name)).all()
+    users = {uid: name for uid, name, _ in rows}
+    return {
+        "users": users,
+        "user_options": _options(users, [uid for uid, _, _ in rows]),
+        "officer_options": _options(users, [uid for uid, _, role in rows if role == "officer"]),
+    }
+
+def user_names() -> Dict[int, str]:
+    return reference_data()["users"]
+
+def user_options() -> Options:
+    return reference_data()["user_options"]
+
+def officer_options() -> Options:
+    return reference_data()["officer_options"]
+
+def option_index(options: Options, user_id: Optional[int], offset: int = 1) -> int:
+    # Position of user_id in a selectbox whose first `offset` entries are placeholders ("Unassigned")
+    _, index = options
+    return index[user_id] + offset if user_id in index else 0
+
+def invalidate():
+    reference_data.clear()
@@ -0,0 +1,244 @@
+import argparse
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy import func, event, inspect, delete, update, case, and_, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+import changefeed
+from db import engine
+from models import Contract, Task, User, ReportSummary, OfficerWorkload
+
+ACTIVE_CONTRACT_STATUSES = ["Draft", "Assigned", "In Progress", "Submitted"]
+OPEN_TASK_STATUSES = ["To Do", "In Progress", "Blocked"]
+TRACKED = {"Contract": Contract, "Task": Task}
+SEEDED = ("_summary", "seeded")  # marker row written by refresh_summary()
+WORKLOAD_MARKER = 0  # OfficerWorkload row written by refresh_workload()
+DUE_SOON_DAYS = 7
+WORKLOAD_COUNTERS = ["open_contracts", "overdue_contracts", "due_week_contracts",
+                     "open_tasks", "overdue_tasks", "due_week_tasks"]
+# model -> (owner column, open statuses, counter suffix)
+WORKLOAD_SOURCES = {Contract: ("officer_id", ACTIVE_CONTRACT_STATUSES, "contracts"),
+                    Task: ("assigned_to", OPEN_TASK_STATUSES, "tasks")}
+
+# --- Live aggregates (GROUP BY / COUNT in the database) ---
+def status_breakdown(session, model) -> Dict[str, int]:
+    rows = session.exec(select(model.status, func.count()).group_by(model.status)).all()
+    return {status: n for status, n in rows}
+
+def overdue_counts(session, today: Optional[date] = None) -> Dict[str, int]:
+    today = today or date.today()
+    contracts = session.exec(select(func.count()).select_from(Contract).where(
+        Contract.status.in_(ACTIVE_CONTRACT_STATUSES), Contract.due_date < today)).one()
+    tasks = session.exec(select(func.count()).select_from(Task).where(
+        Task.status.in_(OPEN_TASK_STATUSES), Task.due_date < today)).one()
+    return {"Contract": contracts, "Task": tasks}
+
+def _bucket(dialect: str, col, period: str):
+    if dialect == "postgresql":
+        return func.date(func.date_trunc(period, col))
+    if period == "month":
+        return func.strftime("%Y-%m-01", col)
+    return func.date(col, "weekday 0", "-6 days")  # Monday of the week
+
+def completion_throughput(session, period: str = "week", since: Optional[datetime] = None) -> List[tuple]:
+    since = since or datetime.utcnow() - timedelta(weeks=26)
+    bucket = _bucket(session.get_bind().dialect.name, Task.completed_at, period).label("period")
+    q = (select(bucket, func.count()).where(Task.status == "Done", Task.completed_at >= since)
+         .group_by(bucket).order_by(bucket))
+    return [(str(p), n) for p, n in session.exec(q).all()]
+
+# --- Materialized per-status summary ---
+def upsert_insert(conn):
+    return pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+
+def _apply_deltas(conn, deltas: Counter):
+    table = ReportSummary.__table__
+    insert = upsert_insert(conn)
+    for (entity, status), d in deltas.items():
+        if not d:
+            continue
+        stmt = insert(table).values(entity=entity, status=status, count=d)
+        conn.execute(stmt.on_conflict_do_update(index_elements=["entity", "status"],
+                                                set_={"count": table.c.count + stmt.excluded.count}))
+
+@event.listens_for(Session, "before_flush")
+def _track_status_changes(session, flush_context, instances):
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, (Contract, Task)):
+            deltas[(type(obj).__name__, obj.status)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, (Contract, Task)):
+            deltas[(type(obj).__name__, inspect(obj).committed_state.get("status", obj.status))] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, (Contract, Task)):
+            hist = inspect(obj).attrs.status.history
+            if hist.has_changes():
+                for old in hist.deleted:
+                    deltas[(type(obj).__name__, old)] -= 1
+                for new in hist.added:
+                    deltas[(type(obj).__name__, new)] += 1
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+def refresh_summary(session):
+    # Full rebuild; also repairs drift after bulk writes that bypass the ORM
+    session.exec(delete(ReportSummary))
+    for entity, model in TRACKED.items():
+        for status, n in status_breakdown(session, model).items():
+            session.add(ReportSummary(entity=entity, status=status, count=n))
+    session.add(ReportSummary(entity=SEEDED[0], status=SEEDED[1], count=1))
+    session.commit()
+
+def summary_counts(session) -> Dict[str, Dict[str, int]]:
+    rows = session.exec(select(ReportSummary)).all()
+    if not any((r.entity, r.status) == SEEDED for r in rows):
+        refresh_summary(session)
+        rows = session.exec(select(ReportSummary)).all()
+    out = {entity: {} for entity in TRACKED}
+    for r in rows:
+        if r.entity in out and r.count:
+            out[r.entity][r.status] = r.count
+    return out
+
+# --- Materialized per-officer workload ---
+def _live_workload(session, today: date) -> Dict[int, Dict[str, int]]:
+    # GROUP BY over every open contract and task: only the reconciliation job runs this
+    soon = today + timedelta(days=DUE_SOON_DAYS)
+    out = defaultdict(lambda: dict.fromkeys(WORKLOAD_COUNTERS, 0))
+    for model, (owner, statuses, kind) in WORKLOAD_SOURCES.items():
+        owner, due = getattr(model, owner), model.due_date
+        q = (select(owner, func.count(), func.sum(case((due < today, 1), else_=0)),
+                    func.sum(case((and_(due >= today, due < soon), 1), else_=0)))
+             .where(model.status.in_(statuses), owner.is_not(None)).group_by(owner))
+        for uid, n, late, week in session.exec(q).all():
+            out[uid].update({f"open_{kind}": n, f"overdue_{kind}": late or 0, f"due_week_{kind}": week or 0})
+    return out
+
+def _lock_workload(session):
+    # Writers block on their counter upsert until the rebuild commits, so none of their deltas are lost
+    if session.get_bind().dialect.name == "postgresql":
+        session.connection().execute(text(f"LOCK TABLE {OfficerWorkload.__tablename__} IN EXCLUSIVE MODE"))
+    else:
+        # Any write takes SQLite's write lock before counting; this one leaves the marker readable
+        w = OfficerWorkload
+        session.exec(update(w).where(w.officer_id == WORKLOAD_MARKER).values(as_of=w.as_of))
+
+def _workload_as_of(session) -> Optional[date]:
+    return session.exec(select(OfficerWorkload.as_of).where(OfficerWorkload.officer_id == WORKLOAD_MARKER)).first()
+
+def refresh_workload(session, today: Optional[date] = None, stale_only: bool = False) -> int:
+    # Full rebuild; also repairs drift after bulk writes and re-buckets overdue/due-soon for a new day.
+    # Returns how many officers' counters changed. With stale_only, a rebuild some other session finished while
+    # this one waited for the lock is not repeated.
+    today = today or date.today()
+    before = {r.officer_id: {c: getattr(r, c) for c in WORKLOAD_COUNTERS}
+              for r in session.exec(select(OfficerWorkload).where(OfficerWorkload.officer_id != WORKLOAD_MARKER)).all()}
+    _lock_workload(session)
+    as_of = _workload_as_of(session)
+    if stale_only and as_of is not None and as_of >= today:
+        session.commit()  # release the lock
+        return 0
+    live = _live_workload(session, today)
+    session.exec(delete(OfficerWorkload))
+    session.add_all([OfficerWorkload(officer_id=uid, as_of=today, **counts) for uid, counts in live.items()])
+    session.add(OfficerWorkload(officer_id=WORKLOAD_MARKER, as_of=today))
+    changefeed.record(session.connection(), OfficerWorkload.__tablename__)  # dashboards cache the counters
+    session.commit()
+    zero = dict.fromkeys(WORKLOAD_COUNTERS, 0)
+    return sum(1 for uid in set(before) | set(live) if before.get(uid, zero) != live.get(uid, zero))
+
+def _committed(obj, attr: str):
+    hist = inspect(obj).attrs[attr].history
+    return hist.deleted[0] if hist.deleted else getattr(obj, attr)
+
+def _workload_share(obj, today: date, old: bool = False) -> Optional[Tuple[int, Dict[str, int]]]:
+    # The counters one contract/task contributes to its owner's row, as it is now or as last flushed
+    owner, statuses, kind = WORKLOAD_SOURCES[type(obj)]
+    value = (lambda a: _committed(obj, a)) if old else (lambda a: getattr(obj, a))
+    uid, due = value(owner), value("due_date")
+    if uid is None or value("status") not in statuses:
+        return None
+    return uid, {f"open_{kind}": 1, f"overdue_{kind}": int(due is not None and due < today),
+                 f"due_week_{kind}": int(due is not None and today <= due < today + timedelta(days=DUE_SOON_DAYS))}
+
+def _apply_workload(conn, deltas: Dict[int, Counter], today: date):
+    table = OfficerWorkload.__table__
+    insert = upsert_insert(conn)
+    for uid, d in deltas.items():
+        d = {c: n for c, n in d.items() if n}
+        if not d:
+            continue
+        stmt = insert(table).values(officer_id=uid, as_of=today, **d)
+        conn.execute(stmt.on_conflict_do_update(index_elements=["officer_id"],
+                                                set_={c: table.c[c] + stmt.excluded[c] for c in d}))
+
+@event.listens_for(Session, "before_flush")
+def _track_workload_changes(session, flush_context, instances):
+    today, deltas = date.today(), defaultdict(Counter)
+    def add(share, sign):
+        if share:
+            uid, counts = share
+            for c, n in counts.items():
+                deltas[uid][c] += sign * n
+    for obj in session.new:
+        if isinstance(obj, (Contract, Task)):
+            add(_workload_share(obj, today), 1)
+    for obj in session.deleted:
+        if isinstance(obj, (Contract, Task)):
+            add(_workload_share(obj, today, old=True), -1)
+    for obj in session.dirty:
+        if isinstance(obj, (Contract, Task)):
+            # Status, reassignment and due-date edits move counts; anything else leaves them alone
+            attrs = inspect(obj).attrs
+            if any(attrs[a].history.has_changes() for a in (WORKLOAD_SOURCES[type(obj)][0], "status", "due_date")):
+                add(_workload_share(obj, today, old=True), -1)
+                add(_workload_share(obj, today), 1)
+    if deltas:
+        _apply_workload(session.connection(), deltas, today)
+
+def _ensure_workload(session, today: date):
+    # Rebuild if never reconciled, or if the day rolled over since (overdue/due-soon buckets are dated)
+    as_of = _workload_as_of(session)
+    if as_of is None or as_of < today:
+        refresh_workload(session, today, stale_only=True)
+
+def officer_workload(session, today: Optional[date] = None) -> List[Dict[str, Any]]:
+    # One row per officer read from the summary table: O(officers), whatever the size of contract/task
+    _ensure_workload(session, today or date.today())
+    w = OfficerWorkload
+    rows = session.exec(
+        select(User.id, User.name, *[getattr(w, c) for c in WORKLOAD_COUNTERS])
+        .join(w, w.officer_id == User.id, isouter=True)
+        .where(or_(w.officer_id.is_not(None), and_(User.role == "officer", User.active == True)))).all()
+    out = [{"officer_id": uid, "officer": name, **{c: n or 0 for c, n in zip(WORKLOAD_COUNTERS, counts)}}
+           for uid, name, *counts in rows]
+    return sorted(out, key=lambda r: (-r["open_contracts"] - r["open_tasks"], r["officer"]))
+
+def my_workload(session, user_id: int, today: Optional[date] = None) -> Dict[str, int]:
+    _ensure_workload(session, today or date.today())
+    row = session.get(OfficerWorkload, user_id)
+    return {c: getattr(row, c) if row else 0 for c in WORKLOAD_COUNTERS}
+
+def reconcile(bind=None) -> Dict[str, int]:
+    with Session(bind or engine) as s:
+        refresh_summary(s)
+        return {"workload_changed": refresh_workload(s)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the report summary and officer workload tables.")
+    parser.add_argument("command", choices=["reconcile"])
+    parser.add_argument("--every", type=int, default=0, help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+    while True:
+        print(datetime.now().isoformat(timespec="seconds"), reconcile())
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+if __name__ == "__main__":
+    main()
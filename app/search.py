@@ -0,0 +1,161 @@
+import argparse
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, false, func, inspect, literal_column, table, column, text
+from sqlmodel import Session, select
+
+from db import engine
+from models import Contract, Task
+
+SEARCH_PAGE_SIZE = 50
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Searchable columns per model with their relevance weight (Postgres A-D, SQLite bm25 multipliers)
+SEARCH_FIELDS: Dict[Any, List[Tuple[str, str]]] = {
+    Contract: [("number", "A"), ("title", "A"), ("agency", "B"), ("description", "C")],
+    Task: [("description", "A")],
+}
+BM25_WEIGHTS = {"A": 10.0, "B": 4.0, "C": 1.0, "D": 0.5}
+
+Cursor = Tuple[float, int]
+
+def _fts(model) -> str:
+    return f"{model.__tablename__}_fts"
+
+# --- Postgres: stored tsvector column + GIN index; the database keeps it current on every write ---
+def _pg_vector(model) -> str:
+    # Punctuation becomes spaces first, as in the query tokenizer: the default parser reads "SYN-00123" as "SYN" + int -00123
+    parts = [f"setweight(to_tsvector('english', regexp_replace(coalesce({c}, ''), '\\W+', ' ', 'g')), '{w}')"
+             for c, w in SEARCH_FIELDS[model]]
+    return " || ".join(parts)
+
+def _setup_postgres(conn, model):
+    name = model.__tablename__
+    conn.execute(text(f"ALTER TABLE {name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                      f"GENERATED ALWAYS AS ({_pg_vector(model)}) STORED"))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{name}_search ON {name} USING gin (search_vector)"))
+
+# --- SQLite: external-content FTS5 table kept in sync by triggers ---
+def _setup_sqlite(conn, model) -> bool:
+    name, fts = model.__tablename__, _fts(model)
+    if fts in inspect(conn).get_table_names():
+        return False
+    cols = [c for c, _ in SEARCH_FIELDS[model]]
+    new, old = ", ".join(f"new.{c}" for c in cols), ", ".join(f"old.{c}" for c in cols)
+    conn.execute(text(f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(cols)}, content='{name}', "
+                      f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"))
+    conn.execute(text(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {name} BEGIN "
+                      f"INSERT INTO {fts}(rowid, {', '.join(cols)}) VALUES (new.id, {new}); END"))
+    conn.execute(text(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {name} BEGIN "
+                      f"INSERT INTO {fts}({fts}, rowid, {', '.join(cols)}) VALUES ('delete', old.id, {old}); END"))
+    # Status/date edits don't touch the index; only changes to searchable text re-index the row
+    conn.execute(text(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {', '.join(cols)} ON {name} BEGIN "
+                      f"INSERT INTO {fts}({fts}, rowid, {', '.join(cols)}) VALUES ('delete', old.id, {old}); "
+                      f"INSERT INTO {fts}(rowid, {', '.join(cols)}) VALUES (new.id, {new}); END"))
+    return True
+
+def is_installed(conn) -> bool:
+    insp = inspect(conn)
+    if conn.dialect.name == "postgresql":
+        return all(any(c["name"] == "search_vector" for c in insp.get_columns(m.__tablename__)) for m in SEARCH_FIELDS)
+    names = insp.get_table_names()
+    return all(_fts(m) in names for m in SEARCH_FIELDS)
+
+def setup(bind=None):
+    with (bind or engine).begin() as conn:
+        if is_installed(conn):
+            return
+        for model in SEARCH_FIELDS:
+            if conn.dialect.name == "postgresql":
+                _setup_postgres(conn, model)
+            elif _setup_sqlite(conn, model):
+                # Index whatever rows existed before the triggers did
+                conn.execute(text(f"INSERT INTO {_fts(model)}({_fts(model)}) VALUES ('rebuild')"))
+
+def rebuild(bind=None):
+    setup(bind)
+    with (bind or engine).begin() as conn:
+        for model in SEARCH_FIELDS:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f"REINDEX INDEX ix_{model.__tablename__}_search"))
+            else:
+                conn.execute(text(f"INSERT INTO {_fts(model)}({_fts(model)}) VALUES ('rebuild')"))
+
+# --- Ranked, keyset-paginated search ---
+def _tokens(term: str) -> List[str]:
+    return TOKEN.findall(term.lower())[:8]
+
+def _ranked(dialect: str, model, tokens: List[str], clauses: List[Any] = (), scored: bool = True):
+    # (id, score) for every match passing the grid filters; higher score = more relevant on both backends.
+    # Filtering here, not after the join, means only the surviving rows are ranked.
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("english", " & ".join(f"{t}:*" for t in tokens))
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        score = func.ts_rank_cd(vector, tsquery)
+        q = select(model.id.label("id")).where(vector.op("@@")(tsquery))
+    else:
+        fts = _fts(model)
+        index = table(fts, column("rowid"))
+        score = -func.bm25(literal_column(fts), *[BM25_WEIGHTS[w] for _, w in SEARCH_FIELDS[model]])
+        match = " ".join(f'"{t}"*' for t in tokens)  # quoted: user input can't inject FTS5 syntax
+        q = select(index.c.rowid.label("id")).where(literal_column(fts).op("MATCH")(match))
+        if clauses:
+            q = q.join(model, model.id == index.c.rowid)
+    if scored:
+        q = q.add_columns(score.label("score"))
+    return q.where(*clauses)
+
+def search(session, model, term: str, clauses: List[Any] = (), after: Optional[Cursor] = None,
+           limit: int = SEARCH_PAGE_SIZE, columns: List[Any] = ()) -> Tuple[List[Tuple[Any, ...]], Optional[Cursor]]:
+    # Rows are (obj, score), or (*columns, score) when columns are given
+    tokens = _tokens(term)
+    if not tokens:
+        return [], None
+    ranked = _ranked(session.get_bind().dialect.name, model, tokens, clauses).subquery()
+    page = select(ranked.c.id, ranked.c.score)
+    if after is not None:
+        score, last_id = after
+        page = page.where(or_(ranked.c.score < score, and_(ranked.c.score == score, ranked.c.id < last_id)))
+    # Rank and page on ids alone, then load only the rows shown
+    page = page.order_by(ranked.c.score.desc(), ranked.c.id.desc()).limit(limit + 1).subquery()
+    q = (select(*columns, page.c.score) if columns else select(model, page.c.score)).join(page, page.c.id == model.id)
+    rows = session.exec(q.order_by(page.c.score.desc(), model.id.desc())).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = (last[-1], last.id if columns else last[0].id)
+    return rows[:limit], next_cursor
+
+def matching(model, term: str, bind=None):
+    # Unranked filter clause for the same matches, for queries that list them in another order (exports)
+    tokens = _tokens(term)
+    if not tokens:
+        return false()
+    return model.id.in_(_ranked((bind or engine).dialect.name, model, tokens, scored=False))
+
+def count_matches(session, model, term: str, clauses: List[Any] = ()) -> int:
+    tokens = _tokens(term)
+    if not tokens:
+        return 0
+    matches = _ranked(session.get_bind().dialect.name, model, tokens, clauses, scored=False).subquery()
+    return session.exec(select(func.count()).select_from(matches)).one()
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search index maintenance.")
+    parser.add_argument("command", choices=["setup", "rebuild", "query"])
+    parser.add_argument("term", nargs="?", default="")
+    parser.add_argument("--entity", choices=["Contract", "Task"], default="Contract")
+    args = parser.parse_args()
+    if args.command == "setup":
+        setup()
+    elif args.command == "rebuild":
+        rebuild()
+        print("Search index rebuilt.")
+    else:
+        model = {"Contract": Contract, "Task": Task}[args.entity]
+        with Session(engine) as s:
+            for obj, score in search(s, model, args.term, limit=10)[0]:
+                print(f"{score:8.3f}  #{obj.id}  {getattr(obj, 'title', None) or obj.description}")
+
+if __name__ == "__main__":
+    main()
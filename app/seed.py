@@ -0,0 +1,143 @@
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlmodel import Session
+
+from models import User, Contract, Task, AuditLog
+from migrate import migrate
+from reports import refresh_summary, refresh_workload
+import audit_store
+
+SEED_BATCH = 10_000
+
+# Rough shape of a contracting shop's data: most work is open or recently closed, a few agencies dominate
+CONTRACT_STATUSES = {"Draft": 10, "Assigned": 15, "In Progress": 20, "Submitted": 10, "Awarded": 15, "Not Awarded": 15, "Closed": 15}
+TASK_STATUSES = {"To Do": 30, "In Progress": 20, "Blocked": 5, "Done": 45}
+AGENCIES = {"Army": 22, "Navy": 16, "Air Force": 14, "DLA": 8, "VA": 10, "GSA": 8, "DHS": 7, "HHS": 5, "NASA": 4,
+            "DOE": 3, "USDA": 2, "DOT": 1}
+NAICS = {"541511": 18, "541512": 16, "541330": 14, "541611": 10, "561210": 9, "236220": 8, "811111": 6, "541519": 6,
+         "518210": 5, "541715": 4, "562910": 2, "488190": 2}
+SET_ASIDES = {None: 40, "Small Business": 20, "SDVOSB": 12, "8(a)": 12, "WOSB": 8, "HUBZone": 8}
+AUDIT_ACTIONS = {"update": 70, "create": 22, "delete": 5, "import": 3}
+WORDS = ["Vehicle", "Maintenance", "Support", "Cloud", "Migration", "Facilities", "Logistics", "Cyber", "Training",
+         "Engineering", "Services", "Modernization", "Data", "Analytics", "Construction", "Environmental", "Medical"]
+
+def weighted(rng: random.Random, dist: Dict[Any, int], k: int) -> List[Any]:
+    return rng.choices(list(dist), weights=list(dist.values()), k=k)
+
+def skewed_ids(rng: random.Random, ids: List[int], k: int) -> List[int]:
+    # Pareto weights: a handful of officers carry most of the work, as in production
+    weights = [rng.paretovariate(1.5) for _ in ids]
+    return rng.choices(ids, weights=weights, k=k)
+
+def _ago(rng: random.Random, now: datetime, days: int) -> datetime:
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+def gen_users(rng, n: int, now: datetime) -> Iterator[List[Dict[str, Any]]]:
+    roles = weighted(rng, {"admin": 5, "officer": 60, "viewer": 35}, n)
+    yield [{"name": f"Seed User {i}", "email": f"seed{i}@example.com", "role": roles[i], "active": rng.random() > 0.05,
+            "created_at": _ago(rng, now, 730)} for i in range(n)]
+
+def gen_contracts(rng, n: int, now: datetime, officers: List[int]) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, n, SEED_BATCH):
+        k = min(SEED_BATCH, n - start)
+        statuses, agencies = weighted(rng, CONTRACT_STATUSES, k), weighted(rng, AGENCIES, k)
+        naics, set_asides = weighted(rng, NAICS, k), weighted(rng, SET_ASIDES, k)
+        owners = skewed_ids(rng, officers, k)
+        rows = []
+        for j in range(k):
+            created = _ago(rng, now, 730)
+            rows.append({"number": f"SYN-{start + j:08d}", "title": " ".join(rng.sample(WORDS, 3)),
+                         "agency": agencies[j], "naics": naics[j], "set_aside": set_asides[j],
+                         "description": None, "status": statuses[j], "officer_id": owners[j] if rng.random() > 0.1 else None,
+                         "due_date": (created + timedelta(days=rng.randint(14, 180))).date(),
+                         "created_at": created, "updated_at": created + (now - created) * rng.random()})
+        yield rows
+
+def gen_tasks(rng, n: int, now: datetime, officers: List[int], contracts: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, n, SEED_BATCH):
+        k = min(SEED_BATCH, n - start)
+        statuses, owners = weighted(rng, TASK_STATUSES, k), skewed_ids(rng, officers, k)
+        rows = []
+        for j in range(k):
+            created = _ago(rng, now, 730)
+            updated = created + (now - created) * rng.random()
+            rows.append({"contract_id": rng.randint(1, contracts) if contracts else None,
+                         "description": f"{rng.choice(WORDS)} task {start + j}", "status": statuses[j],
+                         "assigned_to": owners[j], "due_date": (created + timedelta(days=rng.randint(1, 90))).date(),
+                         "created_at": created, "updated_at": updated,
+                         "completed_at": updated if statuses[j] == "Done" else None})
+        yield rows
+
+def gen_audit(rng, n: int, now: datetime, users: List[int], months: int) -> Iterator[List[Dict[str, Any]]]:
+    # Spread evenly over `months` and emitted oldest first, so ids grow with `at` as they do live
+    span = timedelta(days=30 * months) / max(n, 1)
+    first = now - span * n
+    for start in range(0, n, SEED_BATCH):
+        k = min(SEED_BATCH, n - start)
+        actions, entities, who = weighted(rng, AUDIT_ACTIONS, k), weighted(rng, {"Contract": 40, "Task": 60}, k), skewed_ids(rng, users, k)
+        yield [{"at": first + span * (start + j), "user_id": who[j], "user_name": f"Seed User {who[j]}",
+                "action": actions[j], "entity": entities[j], "entity_id": rng.randint(1, 100_000),
+                "before": json.dumps({"status": "Draft"}) if actions[j] == "update" else None,
+                "after": json.dumps({"status": "Assigned"})} for j in range(k)]
+
+def _load(conn, table, batches: Iterator[List[Dict[str, Any]]], label: str, progress: Callable[[str], None]) -> int:
+    n, t0 = 0, time.perf_counter()
+    for rows in batches:
+        conn.execute(insert(table), rows)
+        conn.commit()
+        n += len(rows)
+        progress(f"\r{label}: {n:,} rows ({n / (time.perf_counter() - t0):,.0f}/s)")
+    if n:
+        progress("\n")
+    return n
+
+def seed(bind, users: int = 200, contracts: int = 100_000, tasks: int = 1_000_000, audit: int = 10_000_000,
+         audit_months: int = 24, seed: int = 42, progress: Callable[[str], None] = lambda s: None) -> Dict[str, int]:
+    rng, now = random.Random(seed), datetime.utcnow()
+    migrate(bind)
+    audit_store.setup(bind, since=(now - timedelta(days=30 * audit_months)).date())
+    with bind.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Contract.__table__)).scalar_one():
+            raise SystemExit("Database already has contracts; seed into an empty database (--url).")
+        _load(conn, User.__table__, gen_users(rng, users, now), "users", progress)
+        u = User.__table__.c
+        user_ids = conn.execute(select(u.id)).scalars().all()
+        officers = conn.execute(select(u.id).where(u.role == "officer")).scalars().all() or user_ids
+        counts = {
+            "users": len(user_ids),
+            "contracts": _load(conn, Contract.__table__, gen_contracts(rng, contracts, now, officers), "contracts", progress),
+            "tasks": _load(conn, Task.__table__, gen_tasks(rng, tasks, now, officers, contracts), "tasks", progress),
+            "audit": _load(conn, AuditLog.__table__, gen_audit(rng, audit, now, user_ids, audit_months), "audit", progress),
+        }
+    # Closed months leave the hot table on SQLite, exactly as the maintenance job would have done
+    audit_store.roll(bind)
+    with Session(bind) as s:
+        refresh_summary(s)
+        refresh_workload(s)
+    with bind.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic users, contracts, tasks and audit rows.")
+    parser.add_argument("--url", required=True, help="SQLAlchemy URL of an empty database")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--contracts", type=int, default=100_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--audit", type=int, default=10_000_000)
+    parser.add_argument("--audit-months", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    counts = seed(create_engine(args.url), args.users, args.contracts, args.tasks, args.audit, args.audit_months,
+                  args.seed, progress=sys.stderr.write)
+    print(json.dumps(counts))
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from typing import Optional, Dict, Any
-from datetime import datetime
 from sqlmodel import select
 
+import audit
 from models import AuditLog, User
 
 def as_dict(obj) -> Dict[str, Any]:
@@ -9,10 +9,14 @@ def as_dict(obj) -> Dict[str, Any]:
         return {}
     return {c: getattr(obj, c) for c in obj.__table__.columns.keys()}
 
-def log(session, user_id: int, action: str):
-    entry = AuditLog(user_id=user_id, action=action, timestamp=datetime.utcnow())
-    session.add(entry)
-    session.commit()
+def log(session, user: Optional[User], action: str, entity: Optional[str] = None, entity_id: Optional[int] = None,
+        before: Optional[Dict[str, Any]] = None, after: Optional[Dict[str, Any]] = None, atomic: bool = False):
+    entry = audit.make_entry(user, action, entity, entity_id, before, after)
+    if atomic:
+        # Same transaction as the caller's mutation; the caller commits
+        session.add(AuditLog(**audit.to_row(entry)))
+    else:
+        audit.enqueue(entry)
 
 def find_user_by_email(session, email: str) -> Optional[User]:
     statement = select(User).where(User.email == email)
@@ -0,0 +1,185 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import List, Set, Tuple
+from sqlalchemy import create_engine, delete, select as sa_select, update
+from sqlmodel import Session
+
+from bench import seed_open_tasks
+from models import Contract, Task, Notification, OfficerWorkload
+from reports import DUE_SOON_DAYS, WORKLOAD_COUNTERS, WORKLOAD_MARKER, WORKLOAD_SOURCES
+
+# Randomized equivalence checks: an incremental path is replayed against random edits, deletes and day changes and
+# compared with a from-scratch recompute after every step. They write to the database; keep --url on a throwaway one.
+DEFAULT_URL = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'verify.db')}"
+CLOSED = {Contract: "Closed", Task: "Done"}
+
+def _pick(conn, rng, model, k: int = 1) -> List[int]:
+    ids = [r[0] for r in conn.execute(sa_select(model.__table__.c.id))]
+    return rng.sample(ids, min(k, len(ids)))
+
+def _random_values(rng, model, today: date, users: int) -> dict:
+    owner, statuses, _ = WORKLOAD_SOURCES[model]
+    return rng.choice([{"status": rng.choice(statuses + [CLOSED[model]])},
+                       {"due_date": rng.choice([None, today + timedelta(days=rng.randint(-10, 15))])},
+                       {owner: rng.choice([None, *range(1, users + 1)])}])
+
+def bulk_edits(bind, rng, today: date, n: int, users: int):
+    # Core updates and deletes, as an import or psql makes them: only updated_at and the change feed triggers see them
+    with bind.begin() as conn:
+        for _ in range(n):
+            model = rng.choice(list(WORKLOAD_SOURCES))
+            t = model.__table__
+            conn.execute(update(t).where(t.c.id.in_(_pick(conn, rng, model)))
+                         .values(updated_at=datetime.utcnow(), **_random_values(rng, model, today, users)))
+        conn.execute(delete(Task.__table__).where(Task.__table__.c.id.in_(_pick(conn, rng, Task))))
+
+def orm_edits(bind, rng, today: date, n: int, users: int):
+    # One save per edit through the ORM, as the forms make them: the before_flush listeners see these
+    with Session(bind) as s:
+        for _ in range(n):
+            model = rng.choice(list(WORKLOAD_SOURCES))
+            ids = _pick(s.connection(), rng, model)
+            obj = s.get(model, ids[0]) if ids else None
+            roll = rng.random()
+            if obj is None or roll < 0.1:
+                _, statuses, _ = WORKLOAD_SOURCES[Task]
+                s.add(Task(contract_id=1, description="verify", status=rng.choice(statuses), assigned_to=rng.randint(1, users),
+                           due_date=today + timedelta(days=rng.randint(-10, 15))))
+            elif roll < 0.2 and model is Task:  # contracts keep their tasks' foreign keys valid
+                s.delete(obj)
+            else:
+                for k, v in _random_values(rng, model, today, users).items():
+                    setattr(obj, k, v)
+                obj.updated_at = datetime.utcnow()
+            s.commit()
+
+# --- Deadlines: deadlines.run() passes vs the alerts every open row should have today ---
+def _expected_alerts(bind, today: date) -> Set[Tuple]:
+    out = set()
+    soon = today + timedelta(days=DUE_SOON_DAYS)
+    with bind.connect() as conn:
+        for model, (owner, statuses, _) in WORKLOAD_SOURCES.items():
+            t = model.__table__
+            for uid, row_id, due, status in conn.execute(sa_select(t.c[owner], t.c.id, t.c.due_date, t.c.status)):
+                if uid is None or due is None or status not in statuses or due >= soon:
+                    continue
+                out.add((t.name, row_id, "overdue" if due < today else "due_soon", due, uid))
+    return out
+
+def _open_alerts(bind) -> Set[Tuple]:
+    n = Notification.__table__.c
+    with bind.connect() as conn:
+        return {tuple(r) for r in conn.execute(sa_select(n.entity, n.entity_id, n.kind, n.due_date, n.user_id)
+                                               .where(n.resolved_at.is_(None)))}
+
+def check_deadlines(url: str, steps: int, seed: int, rows: int, users: int, edits: int) -> bool:
+    import deadlines
+    from migrate import migrate
+    bind = create_engine(url)
+    migrate(bind)
+    seed_open_tasks(bind, rows, users)
+    rng, today = random.Random(seed), date.today()
+    deadlines.rebuild(bind, today)
+    ok = True
+    for step in range(steps):
+        today += timedelta(days=rng.choice([0, 0, 1, 1, 2, 8]))
+        bulk_edits(bind, rng, today, edits, users)
+        orm_edits(bind, rng, today, edits, users)
+        deadlines.run(bind, today)
+        want, got = _expected_alerts(bind, today), _open_alerts(bind)
+        ok = ok and want == got
+        print(f"step {step:>3}  {today}  {len(got):>6} open alerts  "
+              + ("ok" if want == got else f"MISMATCH missing {sorted(want - got)[:3]} extra {sorted(got - want)[:3]}"))
+    return ok
+
+# --- Workload: counters kept by the before_flush deltas vs the reconciliation GROUP BY ---
+def _stored_workload(s) -> dict:
+    w = OfficerWorkload
+    rows = s.exec(sa_select(w.officer_id, *[getattr(w, c) for c in WORKLOAD_COUNTERS]).where(w.officer_id != WORKLOAD_MARKER)).all()
+    return {uid: dict(zip(WORKLOAD_COUNTERS, counts)) for uid, *counts in rows if any(counts)}
+
+def check_workload(url: str, steps: int, seed: int, rows: int, users: int, edits: int) -> bool:
+    # Deltas are dated with the real today, so there are no day jumps here; a new day is a full rebuild anyway
+    from migrate import migrate
+    from reports import _live_workload, refresh_workload
+    bind = create_engine(url)
+    migrate(bind)
+    seed_open_tasks(bind, rows, users)
+    rng, today = random.Random(seed), date.today()
+    with Session(bind) as s:
+        refresh_workload(s, today)
+    ok = True
+    for step in range(steps):
+        orm_edits(bind, rng, today, edits, users)
+        with Session(bind) as s:
+            want, got = {uid: dict(c) for uid, c in _live_workload(s, today).items()}, _stored_workload(s)
+        ok = ok and want == got
+        diff = {uid: (got.get(uid), want.get(uid)) for uid in set(want) | set(got) if want.get(uid) != got.get(uid)}
+        print(f"step {step:>3}  {len(got):>4} officers  " + ("ok" if want == got else f"MISMATCH (stored, live): {diff}"))
+    return ok
+
+# --- Live grids: cached pages patched with change-feed deltas (frames.merge_page) vs a fresh keyset read ---
+def _cells(df) -> List[Tuple]:
+    return [tuple(map(str, r)) for r in df.itertuples(index=False)]
+
+def check_grids(url: str, steps: int, seed: int, rows: int, users: int, edits: int, page_size: int = 10) -> bool:
+    import changefeed
+    import frames
+    from migrate import migrate
+    from queries import contract_filters, task_filters
+    from widgets import grid_page
+    bind = create_engine(url)
+    migrate(bind)
+    seed_open_tasks(bind, rows, users)
+    rng, today = random.Random(seed), date.today()
+    # The Tasks/Contracts grids and "My ..." views, first and second page; the cursor stays put as in a pager
+    views = []
+    with Session(bind) as s:
+        for model, clauses in ((Task, []), (Task, task_filters(assigned_to=1)), (Task, task_filters(status="To Do")),
+                               (Contract, []), (Contract, contract_filters(officer_id=2))):
+            views += [(model, clauses, after) for after in (None, frames.seek_frame(s, model, clauses, page_size=page_size)[1])]
+    caches = [{} for _ in views]
+    changefeed.start(bind)
+    ok = True
+    try:
+        for step in range(steps):
+            bulk_edits(bind, rng, today, edits, users)
+            orm_edits(bind, rng, today, edits, users)
+            changefeed.catch_up(bind)  # the listener gets there within a poll; here, before the refresh
+            stale = 0
+            with Session(bind) as s:
+                for i, ((model, clauses, after), cache) in enumerate(zip(views, caches)):
+                    df, _, next_cursor = grid_page(s, cache, model, clauses, i, after, page_size)
+                    want, want_next = frames.seek_frame(s, model, clauses, after, page_size)
+                    stale += _cells(df) != _cells(want) or next_cursor != want_next
+            ok = ok and not stale
+            print(f"step {step:>3}  {len(views)} pages  " + ("ok" if not stale else f"MISMATCH on {stale} pages"))
+    finally:
+        changefeed.stop()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check incremental bookkeeping against a from-scratch recompute; "
+                                                 "exits 1 on any mismatch.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    checks = {"deadlines": (check_deadlines, "incremental alert runs vs due dates recomputed from every contract/task"),
+              "workload": (check_workload, "per-save workload counter deltas vs the reconciliation GROUP BY"),
+              "grids": (check_grids, "live grid pages merged from change-feed deltas vs a fresh keyset read")}
+    for name, (_, about) in checks.items():
+        p = sub.add_parser(name, help=about)
+        p.add_argument("--steps", type=int, default=20, help="rounds of edits, each followed by a check")
+        p.add_argument("--edits", type=int, default=10, help="edits per round (deadlines: that many bulk and ORM edits)")
+        p.add_argument("--rows", type=int, default=2_000)
+        p.add_argument("--users", type=int, default=5)
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--url", default=DEFAULT_URL, help="throwaway database; the check edits and deletes rows")
+    args = parser.parse_args()
+    ok = checks[args.cmd][0](args.url, args.steps, args.seed, args.rows, args.users, args.edits)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import pandas as pd
+import streamlit as st
+from sqlmodel import select
+
+import auth
+import changefeed
+import frames
+import import_data
+import refdata
+from db import get_session, pool_stats
+from models import User
+from reports import officer_workload, refresh_workload
+
+current_user = auth.current_user()
+if current_user.role != "admin":
+    st.error("Admin only."); st.stop()
+st.title("Admin")
+st.subheader("Users")
+with get_session() as s:
+    users = frames.read_frame(s, select(*frames.columns(User)).order_by(User.created_at.desc()))
+st.dataframe(users, use_container_width=True)
+
+st.subheader("Workload")
+st.caption("Open, overdue and due-this-week counts per officer, for balancing assignments. "
+           "Kept current on every save; reconciliation rebuilds it from scratch.")
+with get_session() as s:
+    workload = officer_workload(s)
+st.dataframe(pd.DataFrame(workload), use_container_width=True, hide_index=True)
+if st.button("Reconcile workload now"):
+    with get_session() as s:
+        st.success(f"Workload rebuilt; {refresh_workload(s)} officers' counts changed.")
+
+st.subheader("Add User")
+with st.form("add_user", clear_on_submit=True):
+    name = st.text_input("Name")
+    email = st.text_input("Email")
+    role = st.selectbox("Role", ["admin","officer","viewer"], index=1)
+    active = st.checkbox("Active", value=True)
+    submitted = st.form_submit_button("Create User")
+    if submitted:
+        with get_session() as s:
+            u = User(name=name.strip(), email=email.strip(), role=role, active=active)
+            s.add(u); s.commit()
+            refdata.invalidate()
+            st.success(f"Created user {name} ({role})")
+
+st.subheader("Bulk Import")
+st.caption("CSV or Excel with a header row. Contracts are matched on `number` and updated in place; "
+           "tasks may reference `contract_number` and `assigned_to_email` instead of ids.")
+with st.form("bulk_import", clear_on_submit=True):
+    entity = st.selectbox("Import", ["Contract", "Task"])
+    upload = st.file_uploader("File", type=["csv", "xlsx"])
+    submitted = st.form_submit_button("Import")
+    if submitted and upload is not None:
+        with st.spinner(f"Importing {upload.name}..."):
+            try:
+                result = import_data.import_file(upload, entity, filename=upload.name, user=current_user)
+            except ValueError as e:
+                st.error(str(e))
+                result = None
+        if result:
+            st.success(f"Imported {result['written']} of {result['rows']} rows in {result['batches']} "
+                       f"batches ({result['seconds']}s).")
+            if result["errors"]:
+                st.warning(f"{len(result['errors'])} rows skipped.")
+                st.dataframe(pd.DataFrame(result["errors"], columns=["line", "error"]), use_container_width=True)
+
+st.subheader("Database Pool")
+st.json(pool_stats())
+
+st.subheader("Change Feed")
+st.caption("Contract/task writes seen by this process; live grids re-read only the rows listed here.")
+st.json(changefeed.stats())
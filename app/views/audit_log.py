@@ -0,0 +1,45 @@
+from datetime import datetime, date, timedelta
+import streamlit as st
+
+import audit_store
+import auth
+import frames
+import refdata
+from db import get_session
+from models import AuditLog
+from widgets import pager_cursors, pager_buttons
+
+AUDIT_PAGE_SIZE = 100
+
+current_user = auth.current_user()
+if current_user.role != "admin":
+    st.error("Admin only.")
+    st.stop()
+st.title("Audit Log")
+colf1, colf2, colf3, colf4 = st.columns([2,2,2,2])
+since = colf1.date_input("Since", value=date.today() - timedelta(days=30))
+user_choice = colf2.selectbox("User", ["All"] + refdata.user_options()[0])
+entity = colf3.selectbox("Entity", ["All", "Contract", "Task", "User"])
+action = colf4.selectbox("Action", ["All", "create", "update", "delete", "import"])
+filters = dict(
+    start=datetime.combine(since, datetime.min.time()) if since else None,
+    user_id=None if user_choice == "All" else int(user_choice.split(":")[0]),
+    entity=None if entity == "All" else entity,
+    action=None if action == "All" else action,
+)
+# A bounded time range keeps the query on recent partitions only
+cursors = pager_cursors("audit", filters)
+with get_session() as s:
+    logs, next_cursor = audit_store.query(s.connection(), after=cursors[-1], limit=AUDIT_PAGE_SIZE, **filters)
+if logs:
+    audit_cols = AuditLog.__table__.columns
+    st.dataframe(frames.to_frame(audit_cols.keys(), logs, [c.type for c in audit_cols]), use_container_width=True)
+else:
+    st.info("No audit entries in this range.")
+pager_buttons("audit", cursors, next_cursor, f"Page {len(cursors)}")
+
+st.subheader("Retention")
+st.caption(f"Months older than {audit_store.AUDIT_RETENTION_MONTHS} are compressed to Parquet in "
+           f"`{audit_store.AUDIT_ARCHIVE_DIR}/` and dropped from the database.")
+if st.button("Run partition maintenance now"):
+    st.success(f"Maintenance done: {audit_store.maintain()}")
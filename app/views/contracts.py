@@ -0,0 +1,121 @@
+from datetime import datetime
+import streamlit as st
+from sqlalchemy.exc import IntegrityError
+
+import auth
+import refdata
+from db import get_session
+from models import Contract
+from queries import contract_filters, lookup_contracts
+from search import matching
+from utils import as_dict, log
+from widgets import paged_grid, search_grid, export_panel, editing_index, edit_base, save_edit, conflict_panel
+
+current_user = auth.current_user()
+st.title("Contracts")
+term = st.text_input("Search", placeholder="Number, title, agency or description", key="contracts_search_term")
+# Filters
+colf1, colf2, colf3, colf4 = st.columns([2,2,2,2])
+status_filter = colf1.selectbox("Status", ["All","Draft","Assigned","In Progress","Submitted","Awarded","Not Awarded","Closed"])
+officer_labels, _ = refdata.officer_options()
+officer_names = ["All"] + officer_labels
+officer_choice = colf2.selectbox("Officer", officer_names)
+agency = colf3.text_input("Agency contains")
+naics = colf4.text_input("NAICS equals")
+
+clauses = contract_filters(
+    status=None if status_filter == "All" else status_filter,
+    officer_id=None if officer_choice == "All" else int(officer_choice.split(":")[0]),
+    agency=agency, naics=naics,
+)
+if term.strip():
+    search_grid("contracts", Contract, term, clauses, (status_filter, officer_choice, agency, naics))
+    clauses = [*clauses, matching(Contract, term)]  # the export holds what the grid shows
+else:
+    paged_grid("contracts", Contract, clauses, (status_filter, officer_choice, agency, naics))
+export_panel("contracts", Contract, clauses, (Contract.updated_at.desc(), Contract.id.desc()), "Export filtered contracts")
+
+st.markdown("---")
+st.subheader("Add / Edit Contract")
+mode = st.radio("Mode", ["Add new", "Edit existing"])
+
+if mode == "Add new":
+    with st.form("add_contract", clear_on_submit=True):
+        number = st.text_input("Contract Number", help="RFP/RFQ/Contract identifier")
+        title = st.text_input("Title")
+        agency = st.text_input("Agency")
+        naics = st.text_input("NAICS")
+        set_aside = st.text_input("Set-aside (e.g., SDVOSB)")
+        description = st.text_area("Description")
+        status = st.selectbox("Status", ["Draft","Assigned","In Progress","Submitted","Awarded","Not Awarded","Closed"], index=0)
+        officer_sel = st.selectbox("Assign Officer", ["Unassigned"] + officer_labels)
+        due = st.date_input("Due Date", value=None)
+        submitted = st.form_submit_button("Create Contract")
+
+        if submitted:
+            if not number.strip() or not title.strip():
+                st.error("Contract number and title are required.")
+            else:
+                with get_session() as s:
+                    officer_id = None if officer_sel == "Unassigned" else int(officer_sel.split(":")[0])
+                    c = Contract(
+                        number=number.strip(), title=title.strip(), agency=agency or None, naics=naics or None,
+                        set_aside=set_aside or None, description=description or None, status=status,
+                        officer_id=officer_id, due_date=due if due else None,
+                        created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+                    )
+                    try:
+                        with s.begin_nested():  # a duplicate number rolls back this insert only
+                            s.add(c)
+                    except IntegrityError:
+                        st.error(f"Contract number {c.number} is already in use.")
+                    else:
+                        s.commit(); s.refresh(c)
+                        log(s, user=current_user, action="create", entity="Contract", entity_id=c.id, after=as_dict(c))
+                        st.success(f"Created contract #{c.id}: {c.number}")
+
+else:
+    term = st.text_input("Find contract", placeholder="ID, number or title", key="edit_contract_search")
+    with get_session() as s:
+        matches = lookup_contracts(s, term)
+    if not matches:
+        st.info("No matching contracts." if term.strip() else "No contracts yet.")
+    else:
+        sel = st.selectbox("Choose contract", matches, index=editing_index("edit_contract", matches), format_func=lambda c: f"#{c.id} {c.number} — {c.title}")
+        base = edit_base("edit_contract", sel)
+        with st.form("edit_contract"):
+            number = st.text_input("Contract Number", value=base["number"] or "")
+            title = st.text_input("Title", value=base["title"] or "")
+            agency = st.text_input("Agency", value=base["agency"] or "")
+            naics = st.text_input("NAICS", value=base["naics"] or "")
+            set_aside = st.text_input("Set-aside", value=base["set_aside"] or "")
+            description = st.text_area("Description", value=base["description"] or "")
+            status_choices = ["Draft","Assigned","In Progress","Submitted","Awarded","Not Awarded","Closed"]
+            status = st.selectbox("Status", status_choices, index=status_choices.index(base["status"] if base["status"] else "Draft"))
+            officer_sel = st.selectbox("Assign Officer", ["Unassigned"] + officer_labels,
+                                       index=refdata.option_index(refdata.officer_options(), base["officer_id"]))
+            due = st.date_input("Due Date", value=base["due_date"])
+            submitted = st.form_submit_button("Save Changes")
+            if submitted:
+                values = dict(
+                    number=number.strip() or base["number"], title=title.strip() or base["title"],
+                    agency=agency or None, naics=naics or None, set_aside=set_aside or None,
+                    description=description or None, status=status,
+                    officer_id=None if officer_sel == "Unassigned" else int(officer_sel.split(":")[0]),
+                    due_date=due if due else None,
+                )
+                with get_session() as s:
+                    db_c = save_edit("edit_contract", s, Contract, base, values)
+                if db_c:
+                    st.success(f"Saved contract #{db_c.id}")
+        conflict_panel("edit_contract", Contract)
+        if current_user.role == "admin":
+            if st.button("Delete this contract"):
+                with get_session() as s:
+                    db_c = s.get(Contract, sel.id)
+                    if db_c and db_c.version != base["version"]:
+                        st.warning(f"Contract #{sel.id} changed since you opened it; reload it before deleting.")
+                    elif db_c:
+                        log(s, user=current_user, action="delete", entity="Contract", entity_id=sel.id, before=as_dict(db_c), after=None, atomic=True)
+                        s.delete(db_c); s.commit()
+                        st.success(f"Deleted contract #{sel.id}")
@@ -0,0 +1,44 @@
+from datetime import date
+import pandas as pd
+import streamlit as st
+
+import auth
+import changefeed
+import deadlines
+from db import get_session
+from models import Contract, Task
+from queries import contract_filters, task_filters
+from reports import my_workload
+from widgets import live_grid
+
+def workload_header(user_id):
+    # Re-read only after a contract/task write or a workload rebuild (or at midnight, when "overdue" moves)
+    def load():
+        with get_session() as s:
+            return my_workload(s, user_id)
+    mine = changefeed.shared(("workload", user_id, date.today()), ["contract", "task", "officerworkload"], load)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Open Contracts", mine["open_contracts"])
+    col2.metric("Open Tasks", mine["open_tasks"])
+    col3.metric("Overdue", mine["overdue_contracts"] + mine["overdue_tasks"])
+    col4.metric("Due This Week", mine["due_week_contracts"] + mine["due_week_tasks"])
+
+current_user = auth.current_user()
+st.title(f"Welcome, {current_user.name}")
+st.fragment(workload_header, run_every=changefeed.live_seconds())(current_user.id)
+
+st.subheader("Alerts")
+with get_session() as s:
+    alerts, n_alerts = deadlines.alerts(s, current_user.id)
+if alerts:
+    st.caption(f"{n_alerts} open alerts" + (f"; the first {len(alerts)} shown." if n_alerts > len(alerts) else "."))
+    st.dataframe(pd.DataFrame(alerts).assign(kind=lambda df: df["kind"].str.replace("_", " ")),
+                 use_container_width=True, hide_index=True)
+else:
+    st.caption("Nothing overdue or due in the next week.")
+
+st.subheader("Assigned Contracts")
+live_grid("my_contracts", Contract, contract_filters(officer_id=current_user.id), current_user.id)
+
+st.subheader("My Tasks")
+live_grid("my_tasks", Task, task_filters(assigned_to=current_user.id), current_user.id)
@@ -0,0 +1,43 @@
+import pandas as pd
+import streamlit as st
+
+import auth
+import perf
+from db import pool_stats
+
+current_user = auth.current_user()
+if current_user.role != "admin":
+    st.error("Admin only."); st.stop()
+st.title("Performance")
+st.caption(f"This process, last {perf.PERF_RERUNS} reruns. Statements over {perf.PERF_SLOW_MS:.0f} ms are logged; "
+           f"a SELECT repeated {perf.PERF_N_PLUS_ONE}+ times in one rerun is flagged as a possible N+1.")
+reruns = pd.DataFrame(perf.recent_reruns(perf.PERF_RERUNS))
+if reruns.empty:
+    st.info("No reruns recorded yet.")
+else:
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Reruns", len(reruns))
+    col2.metric("p50 rerun", f"{reruns['ms'].median():.0f} ms")
+    col3.metric("p95 rerun", f"{reruns['ms'].quantile(0.95):.0f} ms")
+    col4.metric("Queries / rerun", f"{reruns['queries'].mean():.1f}")
+
+    st.subheader("Pages")
+    st.dataframe(pd.DataFrame(perf.page_stats()), use_container_width=True, hide_index=True)
+    st.subheader("Sections and grids")
+    st.dataframe(pd.DataFrame(perf.section_stats()), use_container_width=True, hide_index=True)
+    st.subheader("Slowest statements (total time)")
+    st.dataframe(pd.DataFrame(perf.slowest_statements()), use_container_width=True, hide_index=True)
+    suspects = perf.n_plus_one_suspects()
+    if suspects:
+        st.subheader("Possible N+1 patterns")
+        st.dataframe(pd.DataFrame(suspects), use_container_width=True, hide_index=True)
+    st.subheader("Recent reruns")
+    st.dataframe(reruns.drop(columns=["sections", "n_plus_one"]).assign(started=reruns["started"].astype(str)),
+                 use_container_width=True, hide_index=True)
+
+colm, colr = st.columns(2)
+colm.download_button("Download metrics (Prometheus text)", perf.render_metrics(pool_stats()), "metrics.txt", "text/plain")
+if perf.METRICS_PORT:
+    colm.caption(f"Also served at `:{perf.METRICS_PORT}/metrics`.")
+if colr.button("Reset counters"):
+    perf.reset(); st.rerun()
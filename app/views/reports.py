@@ -0,0 +1,53 @@
+import pandas as pd
+import streamlit as st
+from sqlmodel import select
+
+import frames
+from db import get_session
+from models import Contract, Task
+from reports import ACTIVE_CONTRACT_STATUSES, summary_counts, overdue_counts, officer_workload, completion_throughput
+from widgets import export_panel
+
+REPORT_PREVIEW_ROWS = 200
+
+st.title("Reports")
+active_where, active_order = [Contract.status.in_(ACTIVE_CONTRACT_STATUSES)], [Contract.due_date]
+done_where, done_order = [Task.status=="Done"], [Task.completed_at.desc()]
+with get_session() as s:
+    counts = summary_counts(s)
+    overdue = overdue_counts(s)
+    workload = officer_workload(s)
+    throughput = completion_throughput(s)
+    active_contracts = frames.read_frame(s, select(*frames.columns(Contract)).where(*active_where).order_by(*active_order).limit(REPORT_PREVIEW_ROWS))
+    completed_tasks = frames.read_frame(s, select(*frames.columns(Task)).where(*done_where).order_by(*done_order).limit(REPORT_PREVIEW_ROWS))
+n_active = sum(counts["Contract"].get(x, 0) for x in ACTIVE_CONTRACT_STATUSES)
+n_done = counts["Task"].get("Done", 0)
+
+st.subheader("Summary")
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("Contracts (total)", sum(counts["Contract"].values()))
+col2.metric("Active Contracts", n_active)
+col3.metric("Tasks (total)", sum(counts["Task"].values()))
+col4.metric("Overdue Contracts", overdue["Contract"])
+col5.metric("Overdue Tasks", overdue["Task"])
+colc, colt = st.columns(2)
+colc.caption("Contracts by status")
+colc.bar_chart(pd.Series(counts["Contract"], name="contracts"))
+colt.caption("Tasks by status")
+colt.bar_chart(pd.Series(counts["Task"], name="tasks"))
+
+st.subheader("Officer Workload")
+st.dataframe(pd.DataFrame(workload), use_container_width=True)
+
+st.subheader("Completed Tasks per Week")
+st.line_chart(pd.DataFrame(throughput, columns=["week", "completed"]).set_index("week"))
+
+st.subheader("All Active Contracts")
+st.caption(f"Showing the {len(active_contracts)} soonest due of {n_active}.")
+st.dataframe(active_contracts, use_container_width=True)
+export_panel("active_contracts", Contract, active_where, active_order, "Download Active Contracts")
+
+st.subheader("All Completed Work (Tasks Done)")
+st.caption(f"Showing the {len(completed_tasks)} most recently completed of {n_done}.")
+st.dataframe(completed_tasks, use_container_width=True)
+export_panel("completed_tasks", Task, done_where, done_order, "Download Completed Tasks")
@@ -0,0 +1,101 @@
+from datetime import datetime
+import streamlit as st
+
+import auth
+import refdata
+from db import get_session
+from models import Task
+from queries import task_filters, lookup_contracts, lookup_tasks
+from search import matching
+from utils import as_dict, log
+from widgets import live_grid, search_grid, export_panel, editing_index, edit_base, save_edit, conflict_panel
+
+current_user = auth.current_user()
+st.title("Tasks")
+term = st.text_input("Search", placeholder="Task description", key="tasks_search_term")
+# Filters
+colf1, colf2, colf3, colf4 = st.columns([2,2,2,2])
+status_filter = colf1.selectbox("Status", ["All","To Do","In Progress","Blocked","Done"])
+my_only = colf2.checkbox("Assigned to me only", value=(current_user.role!="admin"))
+due_before = colf3.date_input("Due before", value=None)
+contract_id = colf4.text_input("Contract ID filter")
+
+clauses = task_filters(
+    status=None if status_filter == "All" else status_filter,
+    assigned_to=current_user.id if my_only else None,
+    due_before=due_before,
+    contract_id=int(contract_id.strip()) if contract_id.strip().isdigit() else None,
+)
+if term.strip():
+    search_grid("tasks", Task, term, clauses, (status_filter, current_user.id if my_only else None, due_before, contract_id))
+    clauses = [*clauses, matching(Task, term)]  # the export holds what the grid shows
+else:
+    live_grid("tasks", Task, clauses, (status_filter, current_user.id if my_only else None, due_before, contract_id))
+export_panel("tasks", Task, clauses, (Task.updated_at.desc(), Task.id.desc()), "Export filtered tasks")
+
+st.markdown("---")
+st.subheader("Add Task")
+contract_term = st.text_input("Find contract", placeholder="ID, number or title", key="add_task_contract_search")
+with get_session() as s:
+    contract_options = lookup_contracts(s, contract_term)
+user_labels, _ = refdata.user_options()
+
+with st.form("add_task", clear_on_submit=True):
+    contract_sel = st.selectbox("Contract", contract_options, format_func=lambda c: f"#{c.id} {c.number}")
+    description = st.text_input("Description")
+    status = st.selectbox("Status", ["To Do","In Progress","Blocked","Done"], index=0)
+    assignee = st.selectbox("Assignee", ["Unassigned"] + user_labels)
+    due = st.date_input("Due Date", value=None)
+    submitted = st.form_submit_button("Create Task")
+    if submitted and contract_sel is None:
+        st.error("Choose a contract for the task.")
+    elif submitted:
+        with get_session() as s:
+            t = Task(
+                contract_id=contract_sel.id, description=description.strip(),
+                status=status, assigned_to=None if assignee=="Unassigned" else int(assignee.split(":")[0]),
+                due_date=due if due else None, created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+            )
+            s.add(t); s.commit(); s.refresh(t)
+            log(s, user=current_user, action="create", entity="Task", entity_id=t.id, after=as_dict(t))
+            st.success(f"Created task #{t.id} for contract #{contract_sel.id}")
+
+st.subheader("Edit Task")
+task_term = st.text_input("Find task", placeholder="Task ID, contract ID or description", key="edit_task_search")
+with get_session() as s:
+    matching_tasks = lookup_tasks(s, task_term)
+if not matching_tasks:
+    st.info("No matching tasks." if task_term.strip() else "No tasks to edit.")
+else:
+    sel = st.selectbox("Choose task", matching_tasks, index=editing_index("edit_task", matching_tasks), format_func=lambda t: f"#{t.id} [{t.status}] {t.description[:40]}... (C#{t.contract_id})")
+    base = edit_base("edit_task", sel)
+    with st.form("edit_task"):
+        description = st.text_input("Description", value=base["description"] or "")
+        status = st.selectbox("Status", ["To Do","In Progress","Blocked","Done"], index=["To Do","In Progress","Blocked","Done"].index(base["status"]))
+        assignee = st.selectbox("Assignee", ["Unassigned"] + user_labels,
+                                index=refdata.option_index(refdata.user_options(), base["assigned_to"]))
+        due = st.date_input("Due Date", value=base["due_date"])
+        submitted = st.form_submit_button("Save Task")
+        if submitted:
+            values = dict(
+                description=description.strip() or base["description"], status=status,
+                assigned_to=None if assignee=="Unassigned" else int(assignee.split(":")[0]),
+                due_date=due if due else None,
+            )
+            if status == "Done" and base["status"] != "Done" and not base["completed_at"]:
+                values["completed_at"] = datetime.utcnow()
+            with get_session() as s:
+                db_t = save_edit("edit_task", s, Task, base, values)
+            if db_t:
+                st.success(f"Saved task #{db_t.id}")
+    conflict_panel("edit_task", Task)
+    if current_user.role == "admin":
+        if st.button("Delete this task"):
+            with get_session() as s:
+                db_t = s.get(Task, sel.id)
+                if db_t and db_t.version != base["version"]:
+                    st.warning(f"Task #{sel.id} changed since you opened it; reload it before deleting.")
+                elif db_t:
+                    log(s, user=current_user, action="delete", entity="Task", entity_id=sel.id, before=as_dict(db_t), after=None, atomic=True)
+                    s.delete(db_t); s.commit()
+                    st.success(f"Deleted task #{sel.id}")
@@ -0,0 +1,148 @@
+import os
+import pandas as pd
+import streamlit as st
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+import changefeed
+import edits
+import frames
+import perf
+import search
+from auth import current_user
+from db import get_session
+from export import FORMATS, export_columns, export_query, export_to_tempfile
+from queries import PAGE_SIZES, count_rows
+from utils import as_dict, log
+
+# --- Grids ---
+def pager_cursors(key, filters):
+    # Keyset pager: a stack of cursors, reset whenever the filters change
+    state = st.session_state.setdefault(f"{key}_pager", {"filters": None, "cursors": [None]})
+    if state["filters"] != filters:
+        state.update(filters=filters, cursors=[None])
+    return state["cursors"]
+
+def pager_buttons(key, cursors, next_cursor, caption):
+    colp, coli, coln = st.columns([1,4,1])
+    if colp.button("◀ Prev", key=f"{key}_prev", disabled=len(cursors) == 1):
+        cursors.pop(); st.rerun()
+    coli.caption(caption)
+    if coln.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+        cursors.append(next_cursor); st.rerun()
+
+def grid_page(s, cache, model, clauses, at, after, page_size):
+    # `cache` keeps the page last rendered for these filters/position (session state in the app). While the change
+    # feed runs, a rerun re-reads only the rows changed since then and merges them in; nothing changed, no queries.
+    table = model.__tablename__
+    pos = changefeed.position()  # taken first: a change landing meanwhile is merged (again) next time
+    changed = changefeed.changes_since(cache["pos"], table) if cache.get("at") == at else None
+    if changed == set():
+        return cache["df"], cache["total"], cache["next"]
+    page = frames.merge_page(s, model, clauses, cache["df"], changed, after, cache["next"], page_size) if changed else None
+    if page is None:
+        page = frames.seek_frame(s, model, clauses, after=after, page_size=page_size)
+    # Sessions showing the same filters share one count per change
+    stmt = select(func.count()).select_from(model).where(*clauses).compile(s.get_bind())
+    total = changefeed.shared(("count", str(stmt), repr(stmt.params)), [table], lambda: count_rows(s, model, clauses))
+    cache.update(at=at, pos=pos, df=page[0], next=page[1], total=total)
+    return page[0], total, page[1]
+
+def paged_grid(key, model, clauses, filters):
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    cursors = pager_cursors(key, (filters, page_size))
+    with perf.timed(f"grid: {key}"), get_session() as s:
+        df, total, next_cursor = grid_page(s, st.session_state.setdefault(f"{key}_page", {}), model, clauses,
+                                           (filters, page_size, cursors[-1]), cursors[-1], page_size)
+    st.dataframe(df, use_container_width=True)
+    pager_buttons(key, cursors, next_cursor, f"Page {len(cursors)} of {max(1, -(-total // page_size))} · {total} rows")
+
+def live_grid(key, model, clauses, filters):
+    # Reruns on its own so teammates' edits show up; each tick costs nothing unless the change feed saw writes
+    st.fragment(paged_grid, run_every=changefeed.live_seconds())(key, model, clauses, filters)
+
+def search_grid(key, model, term, clauses, filters):
+    # Ranked full-text matches, keyset-paged on (score, id); the grid filters still apply
+    cursors = pager_cursors(f"{key}_search", (term, filters))
+    cols = frames.columns(model)
+    with perf.timed(f"search: {key}"), get_session() as s:
+        total = search.count_matches(s, model, term, clauses)
+        rows, next_cursor = search.search(s, model, term, clauses, after=cursors[-1], columns=cols)
+    df = frames.to_frame([c.name for c in cols] + ["score"], rows, [c.type for c in cols] + [None])
+    st.dataframe(df.assign(score=df["score"].astype(float).round(3)), use_container_width=True)
+    pages = max(1, -(-total // search.SEARCH_PAGE_SIZE))
+    pager_buttons(f"{key}_search", cursors, next_cursor, f"Page {len(cursors)} of {pages} · {total} matches")
+
+# --- Edit forms ---
+def editing_index(key, options):
+    # Lookups list the most recently updated first, so any save reorders them; stay on the row being edited
+    editing = st.session_state.get(f"{key}_base", {}).get("id")
+    return next((i for i, o in enumerate(options) if o.id == editing), 0)
+
+def edit_base(key, obj):
+    # The row as the form first showed it; a save is checked against this version, not the row re-read on submit
+    base = st.session_state.get(f"{key}_base")
+    if base is None or base["id"] != obj.id:
+        base = st.session_state[f"{key}_base"] = edits.snapshot(obj)
+    if obj.version != base["version"]:
+        st.info(f"Someone saved #{obj.id} since you opened it (now version {obj.version}). "
+                "Your save keeps their changes unless you edited the same fields.")
+    return base
+
+def save_edit(key, s, model, base, values):
+    try:
+        obj, before = edits.save(s, model, base, values)
+    except edits.EditConflict as e:
+        st.session_state[f"{key}_conflict"] = {"id": base["id"], "fields": e.fields, "mine": edits.changed(base, values),
+                                               "current": edits.snapshot(e.current) if e.current else None}
+        return None
+    except IntegrityError:
+        # A value another row already holds in a unique column (the contract number); edits.save rolled it back
+        unique = {c.name for ix in model.__table__.indexes if ix.unique for c in ix.columns}
+        taken = [f"{k} {v!r}" for k, v in edits.changed(base, values).items() if k in unique]
+        st.error(f"{model.__name__} #{base['id']} was not saved: "
+                 + (f"{', '.join(taken)} is already in use." if taken else "the database rejected the change."))
+        return None
+    st.session_state[f"{key}_base"] = edits.snapshot(obj)
+    st.session_state.pop(f"{key}_conflict", None)
+    if before:
+        log(s, user=current_user(), action="update", entity=model.__name__, entity_id=obj.id, before=before, after=as_dict(obj))
+    return obj
+
+def conflict_panel(key, model):
+    conflict = st.session_state.get(f"{key}_conflict")
+    if not conflict:
+        return
+    name = f"{model.__name__} #{conflict['id']}"
+    if conflict["current"] is None:
+        st.error(f"{name} was deleted by someone else; your changes were not saved.")
+    else:
+        st.warning(f"{name} was changed by someone else while you were editing. Nothing was saved; "
+                   "these fields differ:")
+        st.dataframe(pd.DataFrame([{"field": k, "when you opened it": str(a), "yours": str(b), "now": str(c)}
+                                   for k, (a, b, c) in conflict["fields"].items()]), use_container_width=True, hide_index=True)
+    colo, cold = st.columns(2)
+    if conflict["current"] and colo.button("Save mine over theirs", key=f"{key}_overwrite"):
+        with get_session() as s:
+            current = conflict["current"]
+            if save_edit(key, s, model, current, {**current, **conflict["mine"]}):
+                st.rerun()
+    if cold.button("Discard mine and reload", key=f"{key}_discard"):
+        st.session_state.pop(f"{key}_conflict", None)
+        st.session_state.pop(f"{key}_base", None)
+        st.rerun()
+
+# --- Export ---
+def export_panel(key, model, clauses=(), order_by=(), label="Export"):
+    # Streams the same filtered query to a temp file in batches; nothing is built in memory
+    with st.expander(label):
+        all_cols = export_columns(model)
+        cols = st.multiselect("Columns", all_cols, default=all_cols, key=f"{key}_export_cols")
+        fmt = st.radio("Format", list(FORMATS), horizontal=True, key=f"{key}_export_fmt")
+        if st.button("Prepare file", key=f"{key}_export_go", disabled=not cols):
+            path = export_to_tempfile(export_query(model, cols, clauses, order_by), fmt)
+            try:
+                with open(path, "rb") as f:
+                    st.download_button(f"Download {fmt}", f, f"{key}.{FORMATS[fmt][0]}", FORMATS[fmt][1], key=f"{key}_export_dl")
+            finally:
+                os.unlink(path)